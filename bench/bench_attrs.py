@@ -0,0 +1,34 @@
+"""
+Benchmark parsing logfmt-style lines with ``iterattrs()``, against calling
+``attrs()`` once per line. With textdata installed (e.g. ``pip install -e .``),
+run ``python bench/bench_attrs.py [n_lines]``
+"""
+
+from __future__ import print_function
+import sys
+import timeit
+
+from textdata import attrs, iterattrs
+
+
+LINE = ('ts=2024-01-01T00:00:{0:02d}Z level=info msg="request done" '
+        'path=/api/v1/items/{0} status=200 dur=0.{0:03d}')
+
+
+def report(label, func, n):
+    seconds = min(timeit.repeat(func, number=1, repeat=3))
+    print('  {:24} {:9,.0f} lines/s'.format(label, n / seconds))
+
+
+def main(n=100000):
+    lines = [LINE.format(i % 60) for i in range(n)]
+    for evaluate in ('minimal', 'natural'):
+        print("evaluate='{}':".format(evaluate))
+        report('attrs per line', lambda: [attrs(l, evaluate=evaluate) for l in lines], n)
+        report('iterattrs', lambda: list(iterattrs(lines, evaluate=evaluate)), n)
+        report('iterattrs(batch=1000)',
+               lambda: list(iterattrs(lines, evaluate=evaluate, batch=1000)), n)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
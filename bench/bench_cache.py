@@ -0,0 +1,45 @@
+"""
+Benchmark evaluation of repetitive values with and without an
+``EvalCache``, through ``table()`` and ``attrs()``. With textdata
+installed (e.g. ``pip install -e .``), run
+``python bench/bench_cache.py [n_rows]``
+"""
+
+from __future__ import print_function
+import random
+import sys
+import timeit
+
+from textdata import attrs, table, EvalCache
+
+
+def report(label, func, n):
+    uncached = min(timeit.repeat(lambda: func(None), number=1, repeat=3))
+    cache = EvalCache()
+    cached = min(timeit.repeat(lambda: func(cache), number=1, repeat=3))
+    print('  {:8} {:10,.0f} /s uncached {:10,.0f} /s cached   {}'.format(
+        label, n / uncached, n / cached, cache))
+
+
+def main(n=20000):
+    rand = random.Random(0)
+    hosts = ['web-{0:02d}.example.com'.format(i) for i in range(20)]
+    versions = ['1.{0}.{1}'.format(i, j) for i in range(3) for j in range(4)]
+    statuses = ['up', 'down', 'degraded']
+    rows = [(rand.choice(hosts), rand.choice(versions), rand.choice(statuses),
+             rand.choice(['(1, 2)', '(3, 4)']))
+            for _ in range(n)]
+
+    text = '\n'.join(['host                 version  status     shape',
+                      '-------------------- -------- ---------- ------'] +
+                     ['{0:20} {1:8} {2:10} {3}'.format(*row) for row in rows])
+    lines = ['host={0} version={1} status={2} shape="{3}"'.format(*row)
+             for row in rows]
+
+    print('{:,} rows:'.format(n))
+    report('table', lambda cache: table(text, cache=cache), n)
+    report('attrs', lambda cache: [attrs(l, evaluate='full', cache=cache) for l in lines], n)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,49 @@
+"""
+Benchmark evaluating table columns with ``evaluate_column()``, against
+calling ``evaluation()`` on each cell, and parsing a whole table with
+``table()``. With textdata installed (e.g. ``pip install -e .``), run
+``python bench/bench_columns.py [n_rows]``
+"""
+
+from __future__ import print_function
+import random
+import sys
+import timeit
+
+from textdata import table
+from textdata.eval import evaluation, evaluate_column
+
+
+def columns(n):
+    rand = random.Random(0)
+    return [
+        ('ints', [' {0} '.format(rand.randint(-10**6, 10**6)) for _ in range(n)]),
+        ('floats', ['{0:.4f}'.format(rand.uniform(-100, 100)) for _ in range(n)]),
+        ('names', [rand.choice(['Japan', 'Brazil', 'China', 'Chile']) for _ in range(n)]),
+        ('mixed', [rand.choice(['12', '3.5', 'N/A', 'None', 'x-ray', '7']) for _ in range(n)]),
+    ]
+
+
+def per_second(func, n):
+    return n / min(timeit.repeat(func, number=1, repeat=7))
+
+
+def main(n=200000):
+    print('{:,} cells per column (cells/s):'.format(n))
+    print('  {:8} {:>12} {:>12} {:>8}'.format('column', 'per cell', 'column', 'speedup'))
+    for name, values in columns(n):
+        assert evaluate_column(values) == [evaluation(v) for v in values]
+        before = per_second(lambda: [evaluation(v) for v in values], n)
+        after = per_second(lambda: evaluate_column(values), n)
+        print('  {:8} {:12,.0f} {:12,.0f} {:7.1f}x'.format(name, before, after, after / before))
+
+    text = '\n'.join(['      id      ratio name     flag',
+                      '-------- ---------- -------- -----'] +
+                     ['{0:8d} {1:10.3f} {2:8} {3}'.format(i, i / 7.0, 'row', i % 3 == 0)
+                      for i in range(n // 10)])
+    print('table(), {:,} rows of 4 columns: {:,.0f} rows/s'.format(
+        n // 10, per_second(lambda: table(text), n // 10)))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
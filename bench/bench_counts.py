@@ -0,0 +1,52 @@
+"""
+Benchmark counting words with ``word_counts()`` and ``word_counts_many()``
+against ``Counter(words(...))``, in time and peak memory. With textdata
+installed (e.g. ``pip install -e .``), run
+``python bench/bench_counts.py [n_documents]``
+"""
+
+from __future__ import print_function
+from collections import Counter
+import multiprocessing
+import sys
+import timeit
+import tracemalloc
+
+from textdata import words, word_counts, word_counts_many
+
+
+SAMPLE = """
+    The quick brown fox {0} jumps over the "lazy dog"   # comment
+    and runs away from document {0} as fast as it can.
+"""
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def report(label, func):
+    seconds = min(timeit.repeat(func, number=1, repeat=3))
+    print('{:36} {:.3f} s   peak {:>12,} bytes'.format(label, seconds, peak_memory(func)))
+
+
+def main(n=2000):
+    document = ''.join(SAMPLE.format(i) for i in range(50))
+    documents = [document] * n
+    big = document * (n // 10)
+    report('Counter(words(text))', lambda: Counter(words(big)))
+    report('word_counts(text)', lambda: word_counts(big))
+    report('Counter(words(doc)) per document',
+           lambda: sum((Counter(words(d)) for d in documents), Counter()))
+    report('word_counts_many(documents)', lambda: word_counts_many(documents))
+    workers = max(2, multiprocessing.cpu_count())
+    report('word_counts_many(workers={})'.format(workers),
+           lambda: word_counts_many(documents, workers=workers))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
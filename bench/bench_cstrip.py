@@ -0,0 +1,38 @@
+"""
+Benchmark quote-aware comment stripping (``strip_comments()``) against the
+simple ``CSTRIP`` regex substitution, on text with and without comments.
+With textdata installed (e.g. ``pip install -e .``), run
+``python bench/bench_cstrip.py [n_repetitions]``
+"""
+
+from __future__ import print_function
+import sys
+import timeit
+
+from textdata.util import CSTRIP, strip_comments
+
+
+SAMPLES = {
+    'comments': 'name = value  port = 8080   # a comment\n',
+    'quotes': 'name = "value"  port = 8080   # a comment\n',
+    'quoted #': 'url = "http://example.com/#frag"  # link\n',
+    'no comments': 'name = "value"  port = 8080   timeout = 30\n',
+    'few comments': 'name = "value"  port = 8080\n' * 9 + 'tag = "#1"  # first\n',
+}
+
+
+def best(func, repeat=5):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main(n=200000):
+    for name, line in SAMPLES.items():
+        text = line * n
+        regex = best(lambda: CSTRIP.sub('', text))
+        scanner = best(lambda: strip_comments(text))
+        print('{:12} {:,} chars  CSTRIP.sub {:.3f} s  strip_comments {:.3f} s'.format(
+              name, len(text), regex, scanner))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,65 @@
+"""
+Benchmark the memory held by ``Dict`` records after they go out of scope,
+and the time full garbage collections take while many are alive, against a
+``Dict`` that (as ``Dict`` once did) makes itself its own ``__dict__``.
+With textdata installed (e.g. ``pip install -e .``), run
+``python bench/bench_dict.py [n_records]``
+"""
+
+from __future__ import print_function
+import gc
+import sys
+import time
+import tracemalloc
+
+from textdata import Dict
+
+
+class CyclicDict(dict):
+    """The former ``Dict``: attribute access through a reference cycle."""
+    def __init__(self, *args, **kwargs):
+        super(CyclicDict, self).__init__(*args, **kwargs)
+        self.__dict__ = self
+
+
+def make(cls, n):
+    return [cls(name='row', number=i, ratio=i / 2.0) for i in range(n)]
+
+
+def retained(cls, n):
+    """Bytes still allocated once the records are dropped, with no GC run."""
+    gc.collect()
+    gc.disable()
+    try:
+        tracemalloc.start()
+        records = make(cls, n)
+        del records
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    finally:
+        gc.enable()
+        gc.collect()
+    return held
+
+
+def pause(cls, n):
+    """Seconds a full collection takes while the records are alive."""
+    records = make(cls, n)
+    gc.collect()
+    start = time.perf_counter()
+    gc.collect()
+    elapsed = time.perf_counter() - start
+    del records
+    gc.collect()
+    return elapsed
+
+
+def main(n=1000000):
+    print('{:,} records:'.format(n))
+    for cls in (CyclicDict, Dict):
+        print('  {:10} retained {:8.1f} MB   full GC {:7.1f} ms'.format(
+            cls.__name__, retained(cls, n) / 1e6, pause(cls, n) * 1e3))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,49 @@
+"""
+Benchmark the handling of evaluation errors, on clean and on dirty columns,
+under each error policy, against printing each error (as evaluation once
+did, here to ``os.devnull``). With textdata installed (e.g. ``pip install
+-e .``), run ``python bench/bench_errors.py [n_values]``
+"""
+
+from __future__ import print_function
+import os
+import sys
+import timeit
+
+from textdata.eval import EvalErrors, evaluate_column, minimal
+
+
+def to_int(s):
+    return int(s)
+
+
+def main(n=200000):
+    clean = [str(i) for i in range(n)]
+    dirty = [str(i) if i % 2 else 'n/a' for i in range(n)]
+    devnull = open(os.devnull, 'w')
+
+    def printing(s):
+        # the former handling of errors
+        try:
+            return to_int(s)
+        except Exception as e:
+            print(e, file=devnull)
+            return minimal(s)
+
+    print('{:,} values (values/s):'.format(n))
+    print('  {:20} {:>12} {:>12}'.format('policy', 'clean', 'half bad'))
+    policies = [('print (former)', printing, 'fallback')] + \
+        [(p, to_int, p) for p in ('fallback', 'ignore')] + \
+        [('collect', to_int, None)]
+    for label, func, errors in policies:
+        rates = []
+        for values in (clean, dirty):
+            def run():
+                evaluate_column(values, func, errors=errors or EvalErrors(limit=1000))
+            rates.append(n / min(timeit.repeat(run, number=1, repeat=3)))
+        print('  {:20} {:12,.0f} {:12,.0f}'.format(label, *rates))
+    devnull.close()
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
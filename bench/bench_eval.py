@@ -0,0 +1,54 @@
+"""
+Benchmark ``natural`` evaluation of values of various shapes, against
+evaluating them with ``ast.literal_eval`` alone (as ``natural`` once did).
+With textdata installed (e.g. ``pip install -e .``), run
+``python bench/bench_eval.py [n_repeats]``
+"""
+
+from __future__ import print_function
+from ast import literal_eval as ast_literal_eval
+import sys
+import timeit
+
+from textdata.eval import natural
+
+
+SHAPES = [
+    ('int', '8080'),
+    ('negative int', '-42'),
+    ('float', '3.14159'),
+    ('exponent', '6.02e23'),
+    ('bool', 'True'),
+    ('None', 'None'),
+    ('word', 'running'),
+    ('path', '/api/v1/items'),
+    ('timestamp', '2024-01-01T00:00:00Z'),
+    ('IP address', '10.0.0.1'),
+    ('quoted', '"hello world"'),
+    ('list', '[1, 2.5, "three"]'),
+    ('dict', '{"a": 1, "b": [2, 3]}'),
+    ('complex', '1+2j'),
+    ('tuple', "(1, 'a')"),
+]
+
+
+def ast_natural(s):
+    s = s.strip()
+    try:
+        return ast_literal_eval(s)
+    except (ValueError, SyntaxError):
+        return s
+
+
+def main(n=20000):
+    print('{:14} {:>10} {:>10} {:>8}'.format('shape', 'ast (us)', 'now (us)', 'speedup'))
+    for name, value in SHAPES:
+        assert natural(value) == ast_natural(value)
+        before = min(timeit.repeat(lambda: ast_natural(value), number=n, repeat=3)) / n
+        after = min(timeit.repeat(lambda: natural(value), number=n, repeat=3)) / n
+        print('{:14} {:10.2f} {:10.2f} {:7.1f}x'.format(
+            name, before * 1e6, after * 1e6, before / after))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,49 @@
+"""
+Benchmark reading given lines and paragraphs of a large file with and without
+a ``TextIndex``. With textdata installed (e.g. ``pip install -e .``), run
+``python bench/bench_index.py [n_paragraphs]``
+"""
+
+from __future__ import print_function
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+from textdata import lines, paras, text_index
+
+
+SAMPLE = """
+    Paragraph {0}, which runs    # with a comment
+    over a few lines of text.
+"""
+
+
+def report(label, func, repeat=3):
+    seconds = min(timeit.repeat(func, number=1, repeat=repeat))
+    print('{:40} {:.4f} s'.format(label, seconds))
+
+
+def main(n=200000):
+    tempdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tempdir, 'big.txt')
+        with open(path, 'w') as f:
+            f.writelines(SAMPLE.format(i) for i in range(n))
+        middle = n // 2
+
+        report('build and save index', lambda: text_index(path).save(), repeat=1)
+        report('load index', lambda: text_index(path))
+        report('lines(path)[i:i+100]',
+               lambda: lines(path=path, noblanks=False)[middle:middle + 100])
+        report('lines(path, start=, stop=, index=True)',
+               lambda: lines(path=path, start=middle, stop=middle + 100, index=True))
+        report('paras(path)[i]', lambda: paras(path=path)[middle])
+        report('paras(path, index=True)[i]', lambda: paras(path=path, index=True)[middle])
+    finally:
+        shutil.rmtree(tempdir)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
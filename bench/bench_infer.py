@@ -0,0 +1,33 @@
+"""
+Benchmark parsing a table with inferred column types, and with a schema
+inferred beforehand, against natural evaluation of each cell. With textdata
+installed (e.g. ``pip install -e .``), run ``python bench/bench_infer.py [n_rows]``
+"""
+
+from __future__ import print_function
+import random
+import sys
+import timeit
+
+from textdata import table, infer_schema
+
+
+def main(n=20000):
+    rand = random.Random(0)
+    text = '\n'.join(
+        ['id       count    ratio      name   active',
+         '-------- -------- ---------- ------ ------'] +
+        ['{0:<8} {1:<8} {2:<10.4f} {3:6} {4}'.format(
+            i, rand.randint(0, 999), rand.random(), rand.choice(['ann', 'bob', 'cy']),
+            rand.choice(['true', 'false']))
+         for i in range(n)])
+
+    schema = infer_schema(text)
+    print('{:,} rows; inferred schema {}'.format(n, schema))
+    for label, evaluate in [('natural', 'natural'), ('infer', 'infer'), ('schema', schema)]:
+        seconds = min(timeit.repeat(lambda: table(text, evaluate=evaluate), number=1, repeat=3))
+        print('  {:8} {:10,.0f} rows/s'.format(label, n / seconds))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,70 @@
+"""
+Benchmark ``lines()`` speed and memory use on a large indented, commented
+text, given as a string or as a list of lines, and the memory allocated per
+output line beyond the line itself (which measures intermediate copies).
+With textdata installed (e.g. ``pip install -e .``), run
+``python bench/bench_lines.py [n_repetitions]``
+"""
+
+from __future__ import print_function
+import sys
+import timeit
+import tracemalloc
+
+from textdata import lines, words
+
+
+SAMPLE = """
+        some data here, value = 12345   # a comment
+            more indented text
+
+"""
+
+
+def memory(func, *args, **kwargs):
+    """
+    Run ``func`` and return its result, the memory the result retains,
+    and the peak memory allocated while producing it.
+    """
+    tracemalloc.start()
+    result = func(*args, **kwargs)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def report(label, func, source):
+    seconds = min(timeit.repeat(lambda: func(source), number=1, repeat=5))
+    result, current, peak = memory(func, source)
+    print('{}: {:,} lines'.format(label, len(result)))
+    print('  time:         {:.3f} s'.format(seconds))
+    print('  result size:  {:,} bytes'.format(current))
+    print('  peak memory:  {:,} bytes ({:.2f}x result)'.format(peak, peak / current))
+
+
+def per_line(label, func, textlines):
+    """
+    Report the bytes allocated for each output line beyond those it and its
+    list entry retain. The input lines are held by the caller, so every
+    intermediate copy of a line still alive at the peak shows up here.
+    """
+    result, current, peak = memory(func, textlines)
+    size = sys.getsizeof(result[0])
+    print('{}: {:,} lines of {} bytes'.format(label, len(result), size))
+    print('  retained:     {:.1f} bytes/line'.format(current / len(result)))
+    print('  intermediate: {:.1f} bytes/line ({:.2f} line copies)'.format(
+        (peak - current) / len(result), (peak - current) / len(result) / size))
+
+
+def main(n=100000):
+    text = SAMPLE * n
+    textlines = text.splitlines()
+    report('lines(text)', lines, text)
+    report('lines(list)', lines, textlines)
+    report('words(list)', words, textlines)
+    commented = ['        value = 12345   # a comment'] * n
+    per_line('lines(commented list)', lines, commented)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
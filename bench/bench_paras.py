@@ -0,0 +1,46 @@
+"""
+Benchmark ``paras()`` and ``map_paras()`` with and without a pool of worker
+processes. With textdata installed (e.g. ``pip install -e .``), run
+``python bench/bench_paras.py [n_paragraphs]``
+"""
+
+from __future__ import print_function
+import multiprocessing
+import sys
+import timeit
+
+from textdata import paras, map_paras
+
+
+SAMPLE = """
+    From: someone@example.com    # header
+    Subject: paragraph {0}
+
+    Body text of message {0}, which goes on
+    for a line or two, and then some more.
+"""
+
+
+def digest(para):
+    """Some per-paragraph work, enough to be worth farming out."""
+    return sorted(set(para.lower().split()))
+
+
+def report(label, func):
+    seconds = min(timeit.repeat(func, number=1, repeat=3))
+    print('{:32} {:.3f} s'.format(label, seconds))
+
+
+def main(n=100000):
+    text = ''.join(SAMPLE.format(i) for i in range(n))
+    report('paras', lambda: paras(text, join=' '))
+    report('map_paras(digest)', lambda: list(map_paras(digest, text, join=' ')))
+    for workers in sorted(set([2, multiprocessing.cpu_count()])):
+        report('paras, workers={}'.format(workers),
+               lambda: paras(text, join=' ', workers=workers))
+        report('map_paras(digest), workers={}'.format(workers),
+               lambda: list(map_paras(digest, text, join=' ', workers=workers)))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,46 @@
+"""
+Benchmark ``words()`` against the regex-and-``noquotes()`` tokenizing it
+replaces, on token streams with and without quoted phrases. With textdata
+installed (e.g. ``pip install -e .``), run
+``python bench/bench_words.py [megabytes]``
+"""
+
+from __future__ import print_function
+import re
+import sys
+import timeit
+
+from textdata import words
+from textdata.core import WORDRE
+from textdata.util import noquotes
+
+
+SAMPLES = {
+    'no quotes': 'alpha beta  gamma\tdelta 12345 epsilon-zeta\n',
+    'some quotes': 'alpha beta gamma delta "epsilon zeta" eta theta iota\n',
+    'many quotes': 'alpha "beta gamma" delta \'epsilon zeta\' eta\n',
+}
+
+
+def regex_words(text):
+    """The previous tokenizer: a regex pass, then a pass to strip quotes."""
+    return [noquotes(p) for p in re.findall(WORDRE, text.strip())]
+
+
+def report(label, func, text):
+    seconds = min(timeit.repeat(lambda: func(text), number=1, repeat=3))
+    megabytes = len(text) / 1e6
+    print('  {:12} {:.3f} s  {:7.1f} MB/s'.format(label, seconds, megabytes / seconds))
+
+
+def main(megabytes=10):
+    for name, sample in sorted(SAMPLES.items()):
+        text = sample * int(megabytes * 1e6 // len(sample))
+        assert words(text, cstrip=False) == regex_words(text)
+        print('{} ({:.0f} MB):'.format(name, len(text) / 1e6))
+        report('regex', regex_words, text)
+        report('words', lambda t: words(t, cstrip=False), text)
+
+
+if __name__ == '__main__':
+    main(*[float(a) for a in sys.argv[1:]])
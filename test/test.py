@@ -2,6 +2,8 @@
 
 from textdata import *
 from textdata.core import ensure_text, noquotes
+from array import array
+import re
 import sys
 import pytest
 
@@ -155,6 +157,16 @@ def test_malindented_blank_lines():
     """) == "this\n\nis\nok\n\n".splitlines()
 
 
+def test_comment_last_line():
+    # a last line that is all comment is a blank line like any other, and
+    # only it is dropped, however the text ends
+    assert lines('\n\n##', noblanks=False) == ['']
+    assert lines('a\n\n# done', noblanks=False) == ['a', '']
+    assert lines('a\n\n# done\n', noblanks=False) == ['a', '']
+    assert list(iterlines('a\n\n# done', noblanks=False)) == ['a', '']
+    assert paras('a\n\n# done', keep_blanks=True) == [['a'], ['']]
+
+
 def test_extra_start_space():
 
     single_trial('test2', """
@@ -276,6 +288,20 @@ def test_words():
                  ["'this'", 'works', '"great"']
 
 
+def test_words_quote_edges():
+    # exactly as quoted words were always found and stripped
+    assert words('"a"b c') == ['a', 'b', 'c']
+    assert words('a"b c" d') == ['a"b', 'c"', 'd']
+    assert words('"unclosed words here') == ['"unclosed', 'words', 'here']
+    assert words('"\' x') == ["'", 'x']
+    assert words('x " y') == ['x', '', 'y']
+    assert words('a\u3000"b c"\xa0d') == ['a', 'b c', 'd']
+    many = ' '.join('"w %d"' % i for i in range(50))
+    assert words(many) == ['w %d' % i for i in range(50)]
+    sparse = ' '.join('word%d' % i for i in range(100)) + ' "a phrase" end'
+    assert words(sparse) == ['word%d' % i for i in range(100)] + ['a phrase', 'end']
+
+
 def test_words_cstrip():
     w = """ this and
             that
@@ -310,6 +336,98 @@ def test_words_cstrip_example():
              'artifacts', '.DS_Store', '#', 'platform', 'artifacts']
 
 
+def test_words_cstrip_quotes():
+    assert words('a "b # c" d  # comment') == ['a', 'b # c', 'd']
+    assert words("don't # comment") == ["don't"]
+    assert lines("""
+        url = "http://x/#frag"   # link
+        tag = '#1'
+    """) == ['url = "http://x/#frag"', "tag = '#1'"]
+
+
+def test_words_spans():
+    text_ = """ alpha "beta gamma"  'delta'   # comment
+        epsilon  # "quoted" comment
+        zeta" eta """
+    spans = words(text_, spans=True)
+    assert isinstance(spans, array)
+    pairs = list(zip(spans[::2], spans[1::2]))
+    assert [text_[s:e] for s, e in pairs] == words(text_)
+    assert pairs[1] == (8, 18)
+    assert [text_[s:e] for s, e in pairs] == ['alpha', 'beta gamma', 'delta',
+                                              'epsilon', 'zeta"', 'eta']
+    assert len(words(text_, cstrip=False, spans=True)) == 2 * len(words(text_, cstrip=False))
+
+    text_ = ' one / two 2 /three/ '
+    spans = words(text_, sep='/', spans=True)
+    assert [text_[s:e] for s, e in zip(spans[::2], spans[1::2])] == \
+        words(text_, sep='/') == ['one', 'two 2', 'three', '']
+    # spans are contiguous, so take in a comment within a part
+    text_ = 'a, b # c\nd'
+    spans = words(text_, sep=',', spans=True)
+    assert [text_[s:e] for s, e in zip(spans[::2], spans[1::2])] == ['a', 'b # c\nd']
+    assert words(text_, sep=',') == ['a', 'b \nd']
+    assert list(words('', spans=True)) == []
+    with pytest.raises(ValueError):
+        words(['a', 'b'], spans=True)
+
+
+def test_iterwords(tmpdir):
+    data = """
+        alpha "beta
+        gamma" delta   # comment
+        'never closed
+        epsilon "zeta"
+    """
+    it = iterwords(data)
+    assert next(it) == 'alpha'
+    assert list(it) == words(data)[1:]
+    assert list(iterwords(data)) == \
+        ['alpha', 'beta\n        gamma', 'delta', "'never", 'closed', 'epsilon', 'zeta']
+    assert list(iterwords(data.splitlines(), cstrip=False)) == words(data, cstrip=False)
+    assert list(iterwords(['a / b', 'c / d'], sep='/')) == ['a', 'b\nc', 'd']
+    assert list(iterwords('')) == []
+    # line breaks within phrases and parts are kept as in the string
+    crlf = 'x "a\r\nb" y, z # c\r\n'
+    assert list(iterwords(crlf)) == words(crlf) == ['x', 'a\r\nb', 'y,', 'z']
+    assert list(iterwords(crlf, sep=',')) == words(crlf, sep=',')
+    assert sorted(word_counts(crlf).elements()) == sorted(words(crlf))
+
+    p = tmpdir.join('words.txt')
+    p.write_text(data, encoding='utf-8')
+    assert list(iterwords(path=str(p))) == words(data)
+    with p.open() as f:
+        assert list(iterwords(f)) == words(data)
+
+
+def test_word_counts(tmpdir):
+    from collections import Counter
+    doc = """
+        to be or not to be   # that is
+        "the question" to be
+    """
+    assert word_counts(doc) == Counter(words(doc))
+    assert word_counts(doc)['be'] == 3
+    assert word_counts(doc.splitlines(), cstrip=False) == Counter(words(doc, cstrip=False))
+    assert word_counts('a/b/a', sep='/') == Counter({'a': 2, 'b': 1})
+
+    docs = [doc, doc.splitlines(), 'be quick', '']
+    want = sum((Counter(words(d)) for d in docs), Counter())
+    assert word_counts_many(docs) == want
+    assert word_counts_many(iter(docs), chunksize=1) == want
+    assert word_counts_many(docs, workers=2, chunksize=1) == want
+    assert word_counts_many([]) == Counter()
+
+    paths = []
+    for i, d in enumerate([doc, 'be quick']):
+        p = tmpdir.join('doc%d.txt' % i)
+        p.write_text(d, encoding='utf-8')
+        paths.append(str(p))
+    assert word_counts(path=paths[0]) == Counter(words(doc))
+    assert word_counts_many(paths, paths=True) == \
+        Counter(words(doc)) + Counter(words('be quick'))
+
+
 def test_words_sep():
     assert words('one/two/three', sep='/') == ['one', 'two', 'three']
     assert words('one/two 2/three', sep='/') == ['one', 'two 2', 'three']
@@ -411,3 +529,321 @@ def test_textline():
     """) == "this is a question"
 
     assert textline(["    this is", "    a question"]) == "this is a question"
+
+
+def test_iterlines():
+    data = """
+
+
+    This is a test of lines
+
+    here there should be no blanks
+     but some that start wiht a little extra space ok?  # comment
+      which isn't common
+
+
+
+          """
+    result = iterlines(data)
+    assert not isinstance(result, list)
+    assert list(result) == lines(data)
+    assert list(iterlines(data, noblanks=False)) == lines(data, noblanks=False)
+    assert list(iterlines(data, lstrip=True)) == lines(data, lstrip=True)
+    assert list(iterlines(data, cstrip=False)) == lines(data, cstrip=False)
+    assert list(iterlines(data.splitlines())) == lines(data)
+    assert list(iterlines(l for l in data.splitlines())) == lines(data)
+
+    # only true line breaks end an item with an empty line
+    for end in (u'2', u'u', u'\\', u'9'):
+        assert lines(iter([u'a' + end, u'b']), noblanks=False) == [u'a' + end, u'b']
+    assert lines(iter([u'a\x0c', u'b']), noblanks=False) == [u'a', u'', u'b']
+
+
+def test_iterlines_files(tmpdir):
+    import io
+    data = "  one\n\n    two  # comment\n  three\n"
+    assert list(iterlines(io.StringIO(data))) == ['one', '  two', 'three']
+    p = tmpdir.join('data.txt')
+    p.write_text(data, encoding='utf-8')
+    assert list(iterlines(path=str(p))) == ['one', '  two', 'three']
+    with io.open(str(p), encoding='utf-8') as f:
+        assert list(iterlines(f, noblanks=False)) == ['one', '', '  two', 'three']
+
+
+def test_iterlines_indent():
+    data = ['    a', '      b', '  c', '\tb']
+    assert list(iterlines(data)) == ['  a', '    b', 'c', 'b']
+    assert list(iterlines(data, indent=4)) == ['a', '  b', 'c', 'b']
+    assert list(iterlines(data, lookahead=2)) == ['a', '  b', 'c', 'b']
+    assert list(iterlines(data, lookahead=None)) == ['  a', '    b', 'c', 'b']
+    assert list(iterlines(data, dedent=False)) == ['    a', '      b', '  c', '\tb']
+
+
+def test_out(tmpdir):
+    import io
+    data = """
+        Hey diddle diddle,  # some comment!
+        The cat and the fiddle,
+
+          The cow jumped over the moon.
+
+
+        The little dog laughed
+    """
+    f = io.StringIO()
+    assert text(data, out=f) is None
+    assert f.getvalue() == text(data)
+
+    f = io.StringIO()
+    text(data, out=f, join=' ', noblanks=False)
+    assert f.getvalue() == text(data, join=' ', noblanks=False)
+
+    f = io.StringIO()
+    textline(data, out=f)
+    assert f.getvalue() == textline(data)
+
+    f = io.StringIO()
+    paras(data, join=' ', out=f)
+    assert f.getvalue() == '\n\n'.join(paras(data, join=' '))
+    f = io.StringIO()
+    paras(data, out=f)
+    assert f.getvalue() == '\n\n'.join(paras(data, join='\n'))
+
+    chunks = []
+    text(data.split('\n'), out=chunks.append)
+    assert ''.join(chunks) == text(data)
+
+    p = tmpdir.join('out.txt')
+    with p.open('w') as f:
+        text(data, out=f)
+    assert p.read() == text(data)
+
+    big = ['line %d' % i for i in range(5000)]
+    chunks = []
+    text(big, out=chunks.append)
+    assert len(chunks) > 1
+    assert ''.join(chunks) == text(big)
+
+    # the indentation is that of the whole input, however found
+    deep = ['        a'] * 1500 + ['    b']
+    p = tmpdir.join('deep.txt')
+    p.write('\n'.join(deep))
+    for make in [lambda: dict(source=deep), lambda: dict(source='\n'.join(deep)),
+                 lambda: dict(source=iter(deep)), lambda: dict(path=str(p))]:
+        f = io.StringIO()
+        text(out=f, **make())
+        assert f.getvalue() == text(deep)
+        f = io.StringIO()
+        paras(out=f, **make())
+        assert f.getvalue() == '\n\n'.join(paras(deep, join='\n'))
+
+    f = io.StringIO()
+    text(data, out=f, join=True)
+    assert f.getvalue() == text(data, join=True)
+    f = io.StringIO()
+    paras(data, out=f, join=True)
+    assert f.getvalue() == '\n\n'.join(paras(data, join=''))
+    for kwargs in [dict(view=True), dict(start=1), dict(stop=2), dict(index=True)]:
+        with pytest.raises(ValueError):
+            text(data, out=io.StringIO(), **kwargs)
+
+
+def test_iterparas(tmpdir):
+    data = """
+        Hey diddle diddle,  # some comment!
+
+          The cat and the fiddle,
+            The cow jumped over the moon.
+
+
+        The little dog laughed
+    """
+    for keep_blanks in (False, True):
+        for join in (False, ' ', '\n'):
+            assert list(iterparas(data, keep_blanks=keep_blanks, join=join)) == \
+                paras(data, keep_blanks=keep_blanks, join=join)
+    assert list(iterparas(data.splitlines())) == paras(data)
+    assert list(iterparas(data, dedent='para')) == [
+        ['Hey diddle diddle,'],
+        ['The cat and the fiddle,', '  The cow jumped over the moon.'],
+        ['The little dog laughed']]
+    assert list(iterparas(data, dedent=False, join=' '))[0] == '        Hey diddle diddle,'
+
+    p = tmpdir.join('rhyme.txt')
+    p.write_text(data, encoding='utf-8')
+    with p.open() as f:
+        paragraphs = iterparas(f)
+        assert next(paragraphs) == ['Hey diddle diddle,']
+        assert list(paragraphs) == paras(data)[1:]
+    assert list(iterparas(path=str(p), join='\n')) == paras(data, join='\n')
+    assert list(iterparas('')) == []
+
+
+def test_map_paras():
+    data = []
+    for i in range(60):
+        data.extend('    para %d line %d  # note' % (i, j) for j in range(i % 4 + 1))
+        data.extend([''] * (i % 3 + 1))
+    text_ = '\n'.join(data)
+    for keep_blanks in (False, True):
+        for join in (False, '\n'):
+            want = paras(text_, keep_blanks=keep_blanks, join=join)
+            for chunksize in (1, 7, 10000):
+                got = map_paras(None, text_, keep_blanks=keep_blanks, join=join,
+                                chunksize=chunksize)
+                assert list(got) == want
+    assert list(map_paras(len, data, chunksize=5)) == [len(p) for p in paras(data)]
+    assert list(map_paras(len, data, workers=2, chunksize=5)) == [len(p) for p in paras(data)]
+    assert paras(text_, join=' ', workers=2) == paras(text_, join=' ')
+    assert list(map_paras(len, '')) == []
+
+
+def test_map_paras_indent(tmpdir):
+    # the indentation is that of the whole input, not of the first chunk
+    deep = ['        a'] * 30 + ['', '    b']
+    p = tmpdir.join('deep.txt')
+    p.write('\n'.join(deep))
+    want = paras(deep)
+    assert want[-1] == ['b'] and want[0][0] == '    a'
+    assert list(map_paras(None, deep, chunksize=10)) == want
+    assert list(map_paras(None, '\n'.join(deep), chunksize=10)) == want
+    assert list(map_paras(None, iter(deep), chunksize=10)) == want
+    assert list(map_paras(None, path=str(p), chunksize=10)) == want
+    assert list(map_paras(None, path=str(p), mmap=True, chunksize=10, workers=2)) == want
+
+
+def test_tab_indent():
+    import io
+    # tabs in the indentation dedent as if expanded, on every path
+    data = '\n\tfirst\n\t  more\n\n        second\n'
+    want = ['first', '  more', '', 'second']
+    assert lines(data, noblanks=False) == want
+    assert list(lines(data, noblanks=False, view=True)) == want
+    assert list(iterlines(data, noblanks=False)) == want
+    assert text('\tb') == 'b'
+    for source in (data, '\tb'):
+        f = io.StringIO()
+        text(source, out=f)
+        assert f.getvalue() == text(source)
+        f = io.StringIO()
+        paras(source, out=f)
+        assert f.getvalue() == '\n\n'.join(paras(source, join='\n'))
+    assert paras(data) == [['first', '  more'], ['second']]
+    assert list(map_paras(None, data)) == paras(data)
+    assert list(map_paras(None, data.split('\n'), chunksize=2)) == paras(data)
+
+
+def test_lines_path(tmpdir):
+    data = u"""
+        Hey diddle diddle,  # some comment!
+
+        The cat and the fiddle,
+          The cow jumped over the ☾.
+    """
+    p = tmpdir.join('rhyme.txt')
+    p.write_text(data, encoding='utf-8')
+    for mmap in (False, True):
+        assert lines(path=str(p), mmap=mmap) == lines(data)
+        assert lines(path=str(p), mmap=mmap, noblanks=False) == lines(data, noblanks=False)
+        assert text(path=str(p), mmap=mmap) == text(data)
+        assert paras(path=str(p), mmap=mmap, join=' ') == paras(data, join=' ')
+
+    empty = tmpdir.join('empty.txt')
+    empty.write_text(u'', encoding='utf-8')
+    assert lines(path=str(empty), mmap=True) == []
+
+    # a line break just before a newline ends a line of its own
+    for brk in u'\x0c\x1c\x1e\x85\u2028\u2029':
+        data = u'a%s\n\nb\n' % brk
+        want = lines(data, noblanks=False, cstrip=False)
+        assert want == ['a', '', '', 'b']
+        p.write_text(data, encoding='utf-8')
+        for mmap in (False, True):
+            assert lines(path=str(p), mmap=mmap, noblanks=False) == want
+        assert lines(data.encode('utf-8'), noblanks=False) == want
+
+
+def test_lines_view():
+    data = """
+        Hey diddle diddle,  # some comment!
+
+        The cat and the fiddle,
+          The cow jumped over the moon.
+    """
+    view = lines(data, view=True)
+    assert isinstance(view, LineView)
+    assert view.text is data
+    assert view == lines(data)
+    assert len(view) == 3
+    assert view[0] == 'Hey diddle diddle,'
+    assert view[-1] == '  The cow jumped over the moon.'
+    assert isinstance(view[1:], LineView)
+    assert view[1:] == lines(data)[1:]
+    assert view[::-2] == lines(data)[::-2]
+    assert [data[s:e] for s, e in view.spans()] == list(view)
+    assert lines(data, view=True, noblanks=False) == lines(data, noblanks=False)
+    assert lines(data, view=True, lstrip=True) == lines(data, lstrip=True)
+    assert lines(data, view=True, join='\n') == text(data)
+    with pytest.raises(IndexError):
+        view[3]
+    with pytest.raises(ValueError):
+        lines(data, view=True, expandtabs=True)
+
+
+def test_binary_input():
+    data = u"""
+        Hey diddle diddle,  # some comment!
+
+        The cat and the ☾ fiddle,
+    """
+    for binary in (data.encode('utf-8'), bytearray(data.encode('utf-8')),
+                   memoryview(data.encode('utf-8'))):
+        assert lines(binary) == lines(data)
+        assert lines(binary, view=True) == lines(data)
+        assert list(iterlines(binary)) == lines(data)
+        assert text(binary) == text(data)
+        assert paras(binary) == paras(data)
+        assert words(binary) == words(data)
+    latin = data.replace(u'☾', u'é')
+    assert lines(latin.encode('latin-1'), encoding='latin-1') == lines(latin)
+    assert lines([l.encode('utf-8') for l in data.splitlines()]) == lines(data)
+
+
+def test_binary_files():
+    import io
+    data = u"  one\r\n\n    twö  # comment\n  three"
+    f = io.BytesIO(data.encode('utf-8'))
+    assert list(iterlines(f)) == ['one', '  twö', 'three']
+
+
+def test_list_input_equivalence():
+    data = [u'  one  # comment', u'', u'    two "2 3" / four',
+            u'  five / six\tseven', u'', u'  x\ny', u'  ']
+    joined = u'\n'.join(data)
+    assert lines(data) == lines(joined)
+    assert lines(tuple(data), noblanks=False) == lines(joined, noblanks=False)
+    assert paras(data) == paras(joined)
+    assert words(data) == words(joined)
+    assert words(data, sep='/') == words(joined, sep='/')
+    assert words(data[:2]) == words(joined.split('\n')[:2]) == ['one']
+    assert words([]) == words('') == []
+    assert words([], sep='/') == words('', sep='/')
+
+
+def test_lines_match_exclude():
+    log = """
+        INFO   starting up
+            ERROR  disk full   # again
+        INFO   retrying
+          ERROR  disk still full
+        DEBUG  details
+    """
+    assert lines(log, match='ERROR') == ['  ERROR  disk full', 'ERROR  disk still full']
+    assert lines(log, match=re.compile(r'^\s*INFO')) == ['INFO   starting up', 'INFO   retrying']
+    assert lines(log, exclude='INFO|DEBUG') == lines(log, match='ERROR')
+    assert lines(log, match=lambda l: 'full' in l, exclude='still') == ['ERROR  disk full']
+    assert lines(log, match='ERROR', view=True) == lines(log, match='ERROR')
+    assert list(iterlines(log, match='ERROR', lookahead=None)) == lines(log, match='ERROR')
+    assert list(iterlines(log, exclude='ERROR')) == lines(log, exclude='ERROR')
+    assert lines(log, match='again') == ['ERROR  disk full']
+    assert lines(log, match='nothing') == []
@@ -1,4 +1,7 @@
 
+import copy
+import gc
+import pickle
 import sys
 from numbers import Number
 
@@ -103,6 +106,8 @@ def test_attr_cstrip():
         b: "# not a comment"
     """
     assert attrs(t2, cstrip=False) == {'a': 1, 'b': '# not a comment'}
+    assert attrs(t2) == {'a': 1, 'b': '# not a comment'}
+    assert attrs('url="http://x/#frag" # link') == {'url': 'http://x/#frag'}
 
 
 def test_quoted_keys():
@@ -257,3 +262,136 @@ def test_Dict():
 
     assert D2_repr in ["Dict(one=1, two='too')",
                        "Dict(two='too', one=1)"]
+
+    D2.three = 3
+    assert D2['three'] == 3
+    del D2.one
+    assert 'one' not in D2
+    with pytest.raises(AttributeError):
+        D2.one
+    with pytest.raises(AttributeError):
+        del D2.one
+    assert copy.copy(D2) == D2 and type(copy.deepcopy(D2)) is Dict
+    assert pickle.loads(pickle.dumps(D2)) == D2
+
+    # not its own __dict__, so no reference cycle
+    assert D2 not in gc.get_referents(D2)
+
+
+def test_attrs_binary():
+    assert attrs(b'a=1 b="two" c=3.5') == {'a': 1, 'b': 'two', 'c': 3.5}
+    assert attrs(u'name=José'.encode('latin-1'), encoding='latin-1') == {'name': u'José'}
+
+
+def test_attrs_scaling():
+    # time should grow linearly with the length of the text; quadratic
+    # growth would make the larger text thousands of times slower
+    import timeit
+
+    def seconds(n):
+        text = ' '.join('k%d=v%d' % (i, i) for i in range(n))
+        assert len(attrs(text, evaluate='minimal')) == n
+        return min(timeit.repeat(lambda: attrs(text, evaluate='minimal'),
+                                 number=1, repeat=3))
+
+    small, large = 1000, 64000
+    ratio = seconds(large) / seconds(small)
+    assert ratio < 3 * large / small
+
+
+def test_iterattrs(tmpdir):
+    from collections import OrderedDict
+    log = ['ts=2024-01-01T00:00:00Z level=info msg="request done" status=200',
+           '',
+           'level=error msg="bad thing" status=500 dur=0.25   # comment',
+           '  odd = "spacing" ; key:value, "quoted key"=1',
+           'flag']
+    want = [attrs(line) for line in log if line]
+    assert list(iterattrs(log)) == want
+    assert list(iterattrs('\n'.join(log))) == want
+    for evaluate in ('minimal', 'full', None, False):
+        assert list(iterattrs(log, evaluate=evaluate)) == \
+            [attrs(line, evaluate=evaluate) for line in log if line]
+    assert list(iterattrs(log, cstrip=False))[1]['# comment'] is None
+    recs = list(iterattrs(log, dict=OrderedDict))
+    assert all(type(r) is OrderedDict for r in recs)
+    assert list(recs[0]) == ['ts', 'level', 'msg', 'status']
+
+    # keys are interned
+    a, b = iterattrs(['key=1', 'key=2'])
+    assert list(a)[0] is list(b)[0]
+
+    p = tmpdir.join('log.txt')
+    p.write_text(u'\n'.join(log), encoding='utf-8')
+    assert list(iterattrs(path=str(p))) == want
+    with p.open() as f:
+        assert list(iterattrs(f)) == want
+
+    batches = list(iterattrs(log, batch=2))
+    assert len(batches) == 2
+    assert batches[0] == {'ts': ['2024-01-01T00:00:00Z', None],
+                          'level': ['info', 'error'],
+                          'msg': ['request done', 'bad thing'],
+                          'status': [200, 500],
+                          'dur': [None, 0.25]}
+    assert batches[1] == {'odd': ['spacing', None], 'key': ['value', None],
+                          'quoted key': [1, None], 'flag': [None, None]}
+    assert list(iterattrs([], batch=10)) == []
+
+    # records all alike, as in most logs, make the same columns
+    log = ['ts=2024-01-01T00:00:0%d status=%d msg="%d" dur=0.%d' % (i, 200 + i, i, i)
+           for i in range(5)]
+    log[3] = 'ts=2024-01-01T00:00:03 status="203" msg="3" dur=x y'
+    for evaluate in ('natural', 'minimal', False):
+        recs = [attrs(line, evaluate=evaluate) for line in log]
+        batches = list(iterattrs(log, evaluate=evaluate, batch=3))
+        assert [len(batch['ts']) for batch in batches] == [3, 2]
+        assert batches[0] == {key: [rec[key] for rec in recs[:3]] for key in recs[0]}
+        assert list(batches[1]) == ['ts', 'status', 'msg', 'dur', 'y']
+        assert batches[1]['status'] == [recs[3]['status'], recs[4]['status']]
+        assert batches[1]['y'] == [None, None]
+
+
+def test_attrs_schema():
+    schema = {'port': int, 'ratio': float, 'name': str, 'debug': bool}
+    text = "port=8080 ratio=0.5 name=007 debug=False extra=1e3"
+    assert attrs(text, schema=schema) == \
+        dict(port=8080, ratio=0.5, name='007', debug=False, extra=1000.0)
+    assert attrs("port='80'; name: 'a b' extra", schema=schema) == \
+        dict(port=80, name='a b', extra=None)
+
+    parser = AttrsParser(schema, evaluate='minimal', dict=Dict)
+    assert parser('port=1 other=2') == Dict(port=1, other='2')
+    assert [parser(s).port for s in ['port=1', 'port: 2 # comment']] == [1, 2]
+
+    with pytest.raises(ValueError):
+        parser('port=eighty')
+    with pytest.raises(ValueError):
+        parser('debug=maybe')
+    with pytest.raises(ValueError):
+        attrs('port=80 other=1', schema=schema, strict=True)
+    assert attrs('port=80', schema=schema, strict=True) == {'port': 80}
+
+
+def test_attrs_errors():
+    def broken(s):
+        return int(s)
+
+    assert attrs('a=1 b=x', evaluate=broken) == {'a': 1, 'b': 'x'}
+    assert attrs('a=1 b=x', evaluate=broken, errors='ignore') == {'a': 1, 'b': None}
+    with pytest.raises(ValueError):
+        attrs('a=1 b=x', evaluate=broken, errors='raise')
+
+    errors = EvalErrors()
+    assert attrs("a=1 b=x c='y'", evaluate=broken, errors=errors) == {'a': 1, 'b': 'x', 'c': 'y'}
+    assert [(e.row, e.column, e.value) for e in errors] == [(None, 'b', 'x'), (None, 'c', 'y')]
+
+    errors.clear()
+    log = ['a=1 b=2', '', 'a=x b=3', "a=4 b='y z'"]
+    assert list(iterattrs(log, evaluate=broken, errors=errors)) == \
+        [{'a': 1, 'b': 2}, {'a': 'x', 'b': 3}, {'a': 4, 'b': 'y z'}]
+    assert [(e.row, e.column, e.value) for e in errors] == [(2, 'a', 'x'), (3, 'b', 'y z')]
+
+    parser = AttrsParser({'a': int}, evaluate=broken, errors=errors)
+    assert parser('a=1 b=q') == {'a': 1, 'b': 'q'}
+    assert errors.errors[-1][1:3] == ('b', 'q')
@@ -101,3 +101,110 @@ def test_evaluation_exception():
     def broken():
         raise ValueError
     assert evaluation(' mostly   ', broken) == 'mostly'
+
+
+def test_literal_eval_shortcuts():
+    from ast import literal_eval as ast_literal_eval
+    from textdata.eval import literal_eval
+
+    def reference(s):
+        try:
+            return ast_literal_eval(s)
+        except (ValueError, SyntaxError):
+            return s
+
+    cases = ['42', '-7', '+3', '007', '000', '1.', '.5', '-.5', '1e5', '1E-3',
+             '3j', '1+2j', '0x1f', '1_000', 'True', 'False', 'None', 'foo',
+             'lambda', '/api/v1', '2024-01-01T00:00:00Z', '10.0.0.1', '1.2.3',
+             '1 # comment', "1, 'a: b'", '+True', '[1, 2]', '{"a": [1, {"b": 2}]}',
+             '[1.5e3, -0]', '"x"', '"a" "b"', '[01]', '[1.]', '[true]', '[null]',
+             '{"a": 1, "a": 2}', '["\\u00e9"]', '', '9' * 30]
+    for s in cases:
+        result = literal_eval(s)
+        expected = reference(s)
+        assert type(result) is type(expected) and repr(result) == repr(expected)
+
+
+def test_evaluate_column():
+    from textdata.eval import evaluate_column
+    column = [' 1 ', '2', '-3.5', '1e3', '007', 'True', 'False', 'None', 'x', 'y z',
+              'Japan', 'China', '"q"', '1+2j', '', '9' * 5000, '4', '5', 'Truex',
+              '2024-01-01T00:00:00Z', '10.0.0.1', '/api/v1', '@home', '1,2', '3#x']
+    for how in ('natural', 'full', 'minimal', None, True, False, lambda s: s[::-1]):
+        expected = [evaluation(value, how) for value in column]
+        assert evaluate_column(column, how) == expected
+        assert evaluate_column(column[::-1], how) == expected[::-1]
+    assert evaluate_column([]) == []
+    assert evaluate_column(['1', 'a\nb', '2']) == [1, 'a\nb', 2]
+
+
+def test_eval_cache():
+    from textdata.eval import EvalCache, evaluator, evaluate_column, CACHE
+    cache = EvalCache(maxsize=3)
+    evaluate = evaluator('natural', cache)
+    assert [evaluate(s) for s in ['1', '1', ' x ', '1']] == [1, 1, 'x', 1]
+    assert (cache.hits, cache.misses, len(cache)) == (2, 2, 2)
+
+    # mutable results are copied, not shared
+    first = evaluate('[1, 2]')
+    first.append(3)
+    assert evaluate('[1, 2]') == [1, 2]
+
+    # least recently used results are evicted
+    evaluate('2')
+    assert len(cache) == 3
+    evaluate('1')
+    assert cache.misses == 4
+    evaluate(' x ')
+    assert cache.misses == 5
+
+    # modes are cached separately
+    assert evaluation('"1"', 'full', cache) == 1
+    assert evaluation('"1"', 'natural', cache) == '1'
+    assert evaluate_column(['a-b', 'a-b', 'c'], cache=cache) == ['a-b', 'a-b', 'c']
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+    CACHE.clear()
+    assert evaluation('1.5', cache=True) == 1.5
+    assert CACHE.misses == 1
+
+
+def test_evaluation_errors(capsys):
+    from textdata.eval import EvalErrors, ERRORS, evaluate_column, evaluator
+
+    def broken(s):
+        if 'x' in s:
+            raise ValueError(s)
+        return int(s)
+
+    assert evaluation(' x ', broken) == 'x'
+    assert evaluation(' x ', broken, errors='ignore') is None
+    with pytest.raises(ValueError):
+        evaluation(' x ', broken, errors='raise')
+    with pytest.raises(ValueError):
+        evaluation('1', broken, errors='sometimes')
+    assert capsys.readouterr().out == ''
+
+    errors = EvalErrors(limit=2)
+    column = ['1', 'x', '2', 'xx', 'xxx']
+    assert evaluate_column(column, broken, errors=errors, column=3) == [1, 'x', 2, 'xx', 'xxx']
+    assert errors.count == 3
+    assert [(e.row, e.column, e.value) for e in errors] == [(1, 3, 'x'), (3, 3, 'xx')]
+    assert isinstance(errors.errors[0].exception, ValueError)
+    errors.clear()
+    assert evaluate_column(['1', '2'], broken, errors=errors) == [1, 2]
+    assert errors.count == 0
+
+    ERRORS.clear()
+    assert evaluation('x', broken, errors='collect') == 'x'
+    assert [(e.row, e.column, e.value) for e in ERRORS] == [(None, None, 'x')]
+    ERRORS.clear()
+
+    evaluate = evaluator(broken, errors=errors)
+    assert [evaluate(s) for s in ['x', '1', 'xx', 'xxx']] == ['x', 1, 'xx', 'xxx']
+    assert errors.count == 3
+    assert [(e.row, e.value) for e in errors] == [(None, 'x'), (None, 'xx')]
+    assert all(isinstance(e.exception, ValueError) for e in errors)
+    assert evaluate_column(['y', 'x'], broken, errors=errors, column=0) == ['y', 'x']
+    assert errors.count == 5
@@ -0,0 +1,99 @@
+import os
+
+from textdata import *
+from textdata.index import build_index, load_index, INDEX_SUFFIX
+
+
+RHYME = """
+    Hey diddle diddle,   # some comment!
+    The cat and the fiddle,
+
+      The cow jumped over the moon.
+    # just a comment
+
+    The little dog laughed
+      To see such sport,
+
+
+    And the dish ran away with the spoon.
+"""
+
+
+def rhyme_file(tmpdir):
+    p = tmpdir.join('rhyme.txt')
+    p.write_text(RHYME, encoding='utf-8')
+    return str(p)
+
+
+def test_build_index(tmpdir):
+    path = rhyme_file(tmpdir)
+    index = build_index(path)
+    assert len(index) == len(RHYME.splitlines())
+    assert len(index.offsets) == len(index) + 1
+    assert index.offsets[-1] == os.path.getsize(path)
+    assert list(index.para_starts) == [1, 4, 7, 11]
+    assert list(index.para_ends) == [3, 5, 9, 12]
+    assert index.indent == 4
+    assert index.read_lines(1, 3) == RHYME.splitlines()[1:3]
+    assert index.read_lines(-2) == RHYME.splitlines()[-2:]
+    assert index.read_lines(5, 2) == []
+
+    index = build_index(path, cstrip=False)
+    assert list(index.para_starts) == [1, 4, 7, 11]
+    assert list(index.para_ends) == [3, 6, 9, 12]
+
+
+def test_save_load(tmpdir):
+    path = rhyme_file(tmpdir)
+    assert load_index(path) is None
+    index = text_index(path)
+    assert os.path.exists(path + INDEX_SUFFIX)
+    loaded = load_index(path)
+    assert loaded.offsets == index.offsets
+    assert loaded.para_starts == index.para_starts
+    assert loaded.para_ends == index.para_ends
+    assert (loaded.indent, loaded.cstrip) == (4, True)
+
+    # stale once the file changes
+    with open(path, 'a') as f:
+        f.write('One more line\n')
+    assert not index.is_current()
+    assert load_index(path) is None
+    assert text_index(path).para_ends[-1] == len(RHYME.splitlines()) + 1
+
+    # corrupt indexes are ignored
+    with open(path + INDEX_SUFFIX, 'wb') as f:
+        f.write(b'nonsense')
+    assert load_index(path) is None
+
+    other = str(tmpdir.join('elsewhere.tdx'))
+    text_index(path, index_path=other)
+    assert load_index(path, index_path=other) is not None
+
+
+def test_indexed_lines(tmpdir):
+    path = rhyme_file(tmpdir)
+    for start, stop in [(None, None), (2, 8), (4, None), (None, 3), (9, 2)]:
+        assert lines(path=path, start=start, stop=stop, index=True) == \
+            lines(path=path, start=start, stop=stop)
+    assert lines(path=path, start=4, stop=9, index=True) == \
+        lines(RHYME.splitlines()[4:9])
+    assert text(path=path, start=1, stop=3, index=build_index(path)) == \
+        'Hey diddle diddle,\nThe cat and the fiddle,'
+
+
+def test_indexed_paras(tmpdir):
+    path = rhyme_file(tmpdir)
+    for join in (False, ' ', '\n'):
+        indexed = paras(path=path, join=join, index=True)
+        assert isinstance(indexed, IndexedParas)
+        assert len(indexed) == 4
+        assert list(indexed) == paras(RHYME, join=join)
+        assert indexed[-1] == paras(RHYME, join=join)[-1]
+        assert indexed[1:3] == paras(RHYME, join=join)[1:3]
+    assert list(paras(path=path, cstrip=False, index=True)) == paras(RHYME, cstrip=False)
+
+    empty = tmpdir.join('empty.txt')
+    empty.write_text(u'', encoding='utf-8')
+    assert len(paras(path=str(empty), index=True)) == 0
+    assert lines(path=str(empty), index=True) == []
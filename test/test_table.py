@@ -1218,6 +1218,30 @@ def test_records():
     assert result3 == expected3
     assert all(isinstance(r, Dict) for r in result3)
 
+
+def test_table_list_input():
+    text = """
+        name  age  strengths
+        ----  ---  ---------
+        Joe   12   woodworking   # best of show
+        Jill  12   slingshot
+    """
+    assert table(text.splitlines()) == table(text)
+    assert table(tuple(text.splitlines())) == table(text)
+    assert records(iter(text.splitlines())) == records(text)
+
+
+def test_table_binary():
+    text = """
+    name  age  strengths
+    ----  ---  ---------
+    Joe   12   woodworking
+    Zoë   13   snark, snapchat
+    """
+    assert table(text.encode('utf-8')) == table(text)
+    assert records(text.encode('utf-8')) == records(text)
+    assert table(text.encode('latin-1'), encoding='latin-1') == table(text)
+
 """
 ITEM TEMPLATE (for cut and paste)
 
@@ -1277,3 +1301,94 @@ Places this will always fall down:
    permitted in Python 2, but not 3. So Python 2 'natual' will convert '001' to
    1, whereas Python 3, not recognizing '001' as valid, keeps it a string.
 """
+
+
+def test_table_cache():
+    text = """
+        host    status   tags
+        ------- -------- ------
+        web-1   up       [1]
+        web-1   up       [1]
+        db-1    down     [2]
+    """
+    cache = EvalCache()
+    assert table(text, cache=cache) == table(text)
+    assert cache.hits and cache.misses
+    recs = records(text, cache=cache)
+    recs[0].tags.append(9)
+    assert recs[1].tags == [1]
+    assert attrs('a=web-1 b=web-1', cache=cache) == {'a': 'web-1', 'b': 'web-1'}
+
+
+def test_infer():
+    text = """
+        id  name    ratio  ok     code  misc
+        --- ------- ------ ------ ----- -----
+        1   Joe     1.5    True   007   x
+        2   'Jill'  2      false  010   [1]
+        3   Meg     -0.25  TRUE   N/A   2
+    """
+    assert infer_schema(text) == ['int', 'natural', 'float', 'bool', 'str', 'natural']
+    assert infer_schema(text, sample=1) == ['int', 'str', 'float', 'bool', 'str', 'str']
+
+    rows = table(text, evaluate='infer')
+    assert rows[0] == ['id', 'name', 'ratio', 'ok', 'code', 'misc']
+    assert rows[1:] == [[1, 'Joe', 1.5, True, '007', 'x'],
+                        [2, 'Jill', 2.0, False, '010', [1]],
+                        [3, 'Meg', -0.25, True, 'N/A', 2]]
+    assert table(text, evaluate=infer_schema(text)) == rows
+
+    # values that violate the inferred type are evaluated naturally
+    assert table(text, evaluate=['int', 'str', 'int', 'float', 'int'])[1:] == \
+        [[1, 'Joe', 1.5, True, '007', 'x'],
+         [2, 'Jill', 2, 'false', '010', [1]],
+         [3, 'Meg', -0.25, 'TRUE', 'N/A', 2]]
+    assert records(text, evaluate='infer')[1].ratio == 2.0
+
+    # values past the sample that are numbers only to int() stay as natural
+    zips = 'zip\n' + '\n'.join(['12345'] * 20 + ['02134', '1_000', 'nan', 'inf'])
+    assert infer_schema(zips, sample=20) == ['int']
+    assert table(zips, evaluate='infer') == table(zips)
+    assert table(zips, evaluate='float')[-4:] == [['02134'], [1000], ['nan'], ['inf']]
+
+    # as are values past the sample that are not words
+    names = 'name\n' + '\n'.join(['Joe'] * 20 + ['"Jill"', '42', 'True', '[1]', ' Meg '])
+    assert infer_schema(names, sample=20) == ['str']
+    assert table(names, evaluate='infer') == table(names)
+    assert table(names, evaluate='infer')[-5:] == [['Jill'], [42], [True], [[1]], ['Meg']]
+
+
+def test_table_errors():
+    text = """
+        a   b
+        --- ---
+        1   2
+        x   3
+    """
+    def broken(s):
+        return int(s)
+
+    assert table(text, evaluate=broken) == [['a', 'b'], [1, 2], ['x', 3]]
+    # header cells are left alone
+    assert table(text, evaluate=broken, errors='ignore') == [['a', 'b'], [1, 2], [None, 3]]
+    with pytest.raises(ValueError):
+        table(text, evaluate=broken, errors='raise')
+    errors = EvalErrors()
+    assert table(text, evaluate=broken, errors=errors) == table(text, evaluate=broken)
+    assert [(e.row, e.column, e.value.strip()) for e in errors] == [(2, 0, 'x')]
+
+    # rows are numbered as in the result, given header or not
+    errors.clear()
+    assert table('1 2\nx 3', header=['a', 'b'], evaluate=broken, errors=errors) == \
+        [['a', 'b'], [1, 2], ['x', 3]]
+    assert [(e.row, e.column, e.value) for e in errors] == [(2, 0, 'x')]
+    # a given header makes the first row data, no longer spared
+    with pytest.raises(ValueError):
+        table('x 1\ny 2', header='a b', evaluate=broken, errors='raise')
+    assert table('x 1\ny 2', evaluate=broken, errors='ignore') == [['x', 1], [None, 2]]
+
+    clean = text.replace('x', '4')
+    for policy in ('raise', 'ignore', errors):
+        assert records(clean, evaluate=broken, errors=policy) == \
+            [{'a': 1, 'b': 2}, {'a': 4, 'b': 3}]
+    assert errors.count == 1
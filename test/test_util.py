@@ -1,5 +1,5 @@
 
-from textdata.util import partition
+from textdata.util import partition, strip_comments, strip_comment
 
 
 def test_partition():
@@ -10,3 +10,21 @@ def test_partition():
     evens, odds = partition(odd, range(10))
     assert evens == [0, 2, 4, 6, 8]
     assert odds == [1, 3, 5, 7, 9]
+
+
+def test_strip_comments():
+    assert strip_comments('no comment') == 'no comment'
+    assert strip_comments('a b  # comment') == 'a b  '
+    assert strip_comments('a\n# comment\nb # more') == 'a\n\nb '
+    assert strip_comments('url="http://x/#frag" # c') == 'url="http://x/#frag" '
+    assert strip_comments("a '#1' b # c") == "a '#1' b "
+    assert strip_comments("don't # c") == "don't "
+    assert strip_comments("isn't it's # c") == "isn't it's "
+    assert strip_comments('"unclosed # c') == '"unclosed '
+    assert strip_comments('a "b\nc" # d') == 'a "b\nc" '
+
+
+def test_strip_comment():
+    for line in ['no comment', 'a b  # comment', 'url="http://x/#frag" # c',
+                 "a '#1' b # c", "don't # c", '"unclosed # c', '#']:
+        assert strip_comment(line) == strip_comments(line)
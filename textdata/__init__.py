@@ -1,4 +1,6 @@
 from .core import *
-from .attrs import attrs, Dict
-from .table import table, records, keyclean
+from .index import TextIndex, IndexedParas, text_index
+from .attrs import attrs, iterattrs, AttrsParser, Dict
+from .eval import EvalCache, EvalErrors
+from .table import table, records, keyclean, infer_schema
 from .version import __version__
@@ -1,13 +1,19 @@
 
+import re
 import warnings
 from collections import OrderedDict
+from itertools import chain, compress, islice
 
-from .eval import evaluation
-from .util import CSTRIP, ensure_text
+from .eval import (_evaluator, evaluate_column, error_collector,
+                   identity, minimal)
+from .util import ensure_text, ensure_lines, path_lines, strip_comments, strip_comment
 
 # see something, say something
 warnings.simplefilter('once', DeprecationWarning)
 
+# the builtin, as parameters named dict hide it
+_dict = dict
+
 
 def indexOfAny(s, sub, start=None, end=None):
     """
@@ -36,10 +42,39 @@ def isQuote(s):
     return s in quoteChars
 
 
+# Regex matching one attribute definition (and any terminators after it):
+# the key, then the value, either double- or single-quoted, or unquoted
+# (ending at a terminator). No value is matched if it's missing, or if its
+# quote is never closed. Each character is examined a bounded number of
+# times, so the text is scanned once overall, not once per step.
+_PAIR = re.compile(r"""([^=:]*)[=:]\s*"""
+                   r"""(?:"([^"]*)"|'([^']*)'|([^"'][^;, \t\n]*))?[ ;,\t\n]*""").match
+_TERMINALS = re.compile('[ ;,\t\n]*').match
+
+# Regexes matching the simplest (and most common) attribute definition,
+# with a plain key and a value free of space, and a line of nothing else,
+# as written in logfmt logs. They parse as _PAIR would parse them.
+_SIMPLE = r"""([^\s=:"';,]+)[=:](?:"([^"]*)"|([^\s"'][^\s;,]*))(?:[ ;,\t\n]+|\Z)"""
+_SIMPLE_PAIRS = re.compile(_SIMPLE).findall
+_SIMPLE_LINE = re.compile('(?:{0})*\\Z'.format(_SIMPLE)).match
+
+# The same definitions, as a regex splitting a line into key, quote (``"`` or
+# empty), and value groups, with the text between definitions (all empty for a
+# line of nothing else) between them. The quoted value is matched as the
+# unquoted one is, inside the quotes, so the two share a group.
+_SIMPLE_SPLIT = re.compile(r"""([^\s=:"';,]+)[=:]("?)((?<=")[^"]*(?=")|"""
+                           r"""(?<!")[^\s"'][^\s;,]*)"?(?:[ ;,\t\n]+|\Z)""").split
+
+
 def attrs(source, 
           evaluate='natural', 
           dict=dict,
-          cstrip=True):
+          cstrip=True,
+          encoding='utf-8',
+          schema=None,
+          strict=False,
+          cache=None,
+          errors='fallback'):
     """
     Parse attribute strings into a dict (or other mapping type).
     By default evaluates literals as natural to Python, e.g. turning
@@ -48,10 +83,21 @@ def attrs(source,
     Quoted values are always treated as strings, never evaluated.
 
     Args:
-        source (Union[str, List[str]]): Text to parse (as string or list of lines)
+        source (Union[str, bytes, List[str]]): Text to parse (as string or list of lines)
         evaluate (Union[str, bool]): How to evaluate resulting values
         dict (type): Type of mapping to return
         cstrip (bool): Remove comments from string before interpretation?
+        encoding (str): Encoding used to decode binary source
+        schema (Optional[dict]): Converter to apply to the value of each
+            key, instead of evaluating it (see ``AttrsParser``)
+        strict (bool): Raise ``ValueError`` for keys not in ``schema``?
+        cache (Union[EvalCache, bool, None]): Cache for evaluation results,
+            worthwhile where values often repeat. True for the shared cache.
+        errors (Union[str, EvalErrors]): What to do when a value fails to
+            evaluate: 'fallback' to minimal evaluation, 'raise' the
+            exception, 'ignore' it (making the value None), or 'collect' it
+            (in the shared ``eval.ERRORS``, or a given ``EvalErrors``), noting
+            its key, and falling back.
         astyle: Deprecated. Use ``dict`` parameter instead.
         literal: Deprecated. Use ``evaluate`` parameter instead.
 
@@ -59,62 +105,393 @@ def attrs(source,
         dict (or given dict type)
     """
 
-    text = ensure_text(source)
+    if schema is not None or strict:
+        parser = AttrsParser(schema, evaluate, dict, cstrip, strict, encoding,
+                             cache, errors)
+        return parser.parse(source)
+
+    text = ensure_text(source, encoding)
 
     # trim comments (optionally) and excess whitespace at ends
     if cstrip:
-        text = CSTRIP.sub('', text).strip()
+        text = strip_comments(text)
     text = text.strip()
 
+    return _parse_attrs(text, evaluate, dict, cache=cache, errors=errors)
+
+
+def iterattrs(source=None,
+              evaluate='natural',
+              dict=dict,
+              cstrip=True,
+              encoding='utf-8',
+              batch=None,
+              path=None,
+              cache=None,
+              errors='fallback'):
+    """
+    Parse a stream of attribute strings, one record per line (as in logfmt
+    logs), generating a dict (or other mapping type) for each non-blank
+    line. Lines are parsed as ``attrs()`` parses them. Reads files and
+    iterators lazily, and interns keys, so records with the same keys share
+    the key strings. Optionally gathers records into columnar batches.
+
+    Args:
+        source (Union[str, bytes, List[str], file]): Text, lines, or open file to parse
+        evaluate (Union[str, bool]): How to evaluate resulting values
+        dict (type): Type of mapping to return
+        cstrip (bool): Remove comments from lines before interpretation?
+        encoding (str): Encoding used to decode binary source or file
+        batch (Optional[int]): If given, generate instead a dict of lists
+            (one per key, ``None`` where a record lacks the key) for every
+            ``batch`` records
+        path (Optional[str]): Path of a file to read, instead of ``source``
+        cache (Union[EvalCache, bool, None]): Cache for evaluation results
+        errors (Union[str, EvalErrors]): What to do when a value fails to
+            evaluate (see ``attrs()``); collected errors note the index of
+            the line as their row
+
+    Returns:
+        iterator over dicts (or given dict type), or dicts of lists if ``batch``
+    """
+    if path is None:
+        textlines = ensure_lines(source, encoding)
+    else:
+        textlines = path_lines(path, encoding)
+    if batch and error_collector(errors) is None:
+        return _iter_columns(textlines, batch, evaluate, cstrip, cache, errors)
+    records = _iter_records(textlines, evaluate, dict, cstrip, cache, errors)
+    return records if not batch else _iter_batches(records, batch)
+
+
+def _record_lines(textlines, cstrip):
+    """
+    Generate the index and text of each non-blank line, with comments (if
+    ``cstrip``) and surrounding space removed.
+    """
+    for lineno, line in enumerate(textlines):
+        if cstrip and '#' in line:
+            line = strip_comment(line)
+        line = line.strip()
+        if line:
+            yield lineno, line
+
+
+def _iter_records(textlines, evaluate, dict, cstrip, cache=None, errors='fallback'):
+    """
+    Generate the attributes parsed from each non-blank line. Lines of
+    simple definitions are parsed whole, rather than one definition at a
+    time.
+    """
+    keys = {}
+    intern = keys.setdefault
+    quoted_raw = evaluate in ('natural', 'minimal')
+    evaluate_value = _evaluator(evaluate, cache, errors)
+    collector = error_collector(errors)
+    plain = evaluate_value is identity or (evaluate_value is minimal and quoted_raw)
+    for lineno, line in _record_lines(textlines, cstrip):
+        parts = _SIMPLE_SPLIT(line)
+        if any(parts[::4]):
+            yield _parse_attrs(line, evaluate, dict, keys, cache, errors, lineno)
+            continue
+        # a simple value has no surrounding space, so is its own minimal
+        # evaluation
+        names = parts[1::4]
+        names = map(intern, names, names)
+        if plain:
+            record = _dict(zip(names, parts[3::4]))
+        elif quoted_raw and '"' in line:
+            record = {name: value if quote else evaluate_value(value)
+                      for name, quote, value in zip(names, parts[2::4], parts[3::4])}
+        else:
+            record = _dict(zip(names, map(evaluate_value, parts[3::4])))
+        if collector is not None:
+            collector.resolve(record, row=lineno)
+        yield record if dict is _dict else dict(record)
+
+
+def _iter_batches(records, size):
+    """
+    Gather records into columns, generating a dict of lists for every
+    ``size`` records. Each column is built in one pass over the records.
+    """
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield {key: [record.get(key) for record in chunk]
+               for key in _dict.fromkeys(chain.from_iterable(chunk))}
+
+
+def _iter_columns(textlines, size, evaluate, cstrip, cache=None, errors='fallback'):
+    """
+    Like ``_iter_batches(_iter_records(...))``, but gathers the unevaluated
+    values of every ``size`` records into columns, then evaluates each
+    column at once (see ``evaluate_column()``). Quoted values are left as
+    they are where ``evaluate`` says so, and missing ones left ``None``.
+    Where every record of a batch defines the same keys in the same order,
+    as log lines usually do, the columns are found by transposing the rows.
+    """
+    keys = {}
+    intern = keys.setdefault
+    quoted_raw = evaluate in ('natural', 'minimal')
+    evaluate_value = _evaluator(evaluate, cache, errors)
+    plain = evaluate_value is identity or (evaluate_value is minimal and quoted_raw)
+    textlines = _record_lines(textlines, cstrip)
+    while True:
+        chunk = list(islice(textlines, size))
+        if not chunk:
+            return
+        name_rows, quote_rows, value_rows, simple = [], [], [], True
+        for _, line in chunk:
+            parts = _SIMPLE_SPLIT(line)
+            if any(parts[::4]):
+                pairs = list(_pairs(line, keys))
+                name_rows.append([pair[0] for pair in pairs])
+                value_rows.append([pair[1] for pair in pairs])
+                quote_rows.append([pair[2] for pair in pairs])
+                simple = False
+            else:
+                name_rows.append(parts[1::4])
+                quote_rows.append(parts[2::4])
+                value_rows.append(parts[3::4])
+
+        names = name_rows[0]
+        if name_rows.count(names) == len(name_rows) and len(set(names)) == len(names):
+            columns = {}
+            for name, values, quotes in zip(names, zip(*value_rows), zip(*quote_rows)):
+                column = list(values)
+                if not (plain and simple):
+                    skip = None
+                    if quoted_raw and any(quotes):
+                        skip = set(compress(range(len(quotes)), quotes))
+                    column = _evaluate_cells(column, skip, evaluate, cache, errors)
+                columns[intern(name, name)] = column
+            yield columns
+            continue
+
+        records, quoted = [], {}
+        for row, (names, quotes, values) in enumerate(zip(name_rows, quote_rows, value_rows)):
+            names = list(map(intern, names, names))
+            record = _dict(zip(names, values))
+            if quoted_raw and any(quotes):
+                if len(record) < len(names):
+                    # the last definition of a repeated key decides
+                    quoted_names = [name for name in record
+                                    if quotes[len(names) - 1 - names[::-1].index(name)]]
+                else:
+                    quoted_names = compress(names, quotes)
+                for name in quoted_names:
+                    quoted.setdefault(name, set()).add(row)
+            records.append(record)
+        columns = _dict.fromkeys(chain.from_iterable(records))
+        for name in columns:
+            column = [record.get(name) for record in records]
+            if not (plain and simple):
+                column = _evaluate_cells(column, quoted.get(name), evaluate, cache, errors)
+            columns[name] = column
+        yield columns
+
+
+def _evaluate_cells(column, skip, evaluate, cache, errors):
+    """
+    Evaluate the values of ``column`` in place, other than those missing
+    (``None``) or at the rows in ``skip``.
+    """
+    if not skip and None not in column:
+        return evaluate_column(column, evaluate, cache, errors)
+    rows = [row for row, value in enumerate(column)
+            if value is not None and not (skip and row in skip)]
+    if rows:
+        values = evaluate_column([column[row] for row in rows], evaluate, cache, errors)
+        for row, value in zip(rows, values):
+            column[row] = value
+    return column
+
+
+def _parse_attrs(text, evaluate='natural', dict=dict, keys=None, cache=None,
+                 errors='fallback', row=None):
+    """
+    Parse the attribute definitions of ``text`` (comments and surrounding
+    space already removed) into a new ``dict``. If a ``keys`` mapping is
+    given, keys are interned in it, so repeated keys share one string.
+    Evaluation results are cached in ``cache``, if given, and errors
+    handled as ``errors`` directs (collected at the given ``row``).
+    """
     res = dict()
+    quoted_raw = evaluate in ('natural', 'minimal')
+    evaluate_value = _evaluator(evaluate, cache, errors)
+    for key, value, quoted in _pairs(text, keys):
+        if value is None:
+            res[key] = None
+        elif quoted and quoted_raw:
+            res[key] = value
+        else:
+            res[key] = evaluate_value(value)
+    collector = error_collector(errors)
+    return res if collector is None else collector.resolve(res, row=row)
+
+
+def _pairs(text, keys=None):
+    """
+    Generate the ``(key, value, quoted)`` attribute definitions of ``text``
+    (comments and surrounding space already removed), in order. ``value`` is
+    ``None`` where the definition has none. If a ``keys`` mapping is given,
+    keys are interned in it.
+    """
     tlen = len(text)
-    cursor = 0
 
     # possible that cursor rests on terminator even to start
-    while cursor < tlen and text[cursor] in terminalChars:
-        cursor += 1
+    cursor = _TERMINALS(text).end()
 
     # while still more data, tease it out
     while cursor < tlen:
-        assignIndex = indexOfAny(text, equalsChars, cursor)
-        if assignIndex is None:
+        m = _PAIR(text, cursor)
+        if m is None:
             remaining = text[cursor:].strip()
             if remaining:
-                res[remaining] = None
-            return res
+                yield remaining, None, False
+            return
 
-        left = text[cursor:assignIndex].strip()
+        left, dquoted, squoted, unquoted = m.groups()
+        left = left.strip()
         if left and isQuote(left[0]):
             left = left[1:-1]
-        rcursor = assignIndex + 1
-        # find the non-whitespace rhs of the attribute definition
-        while rcursor < tlen and isWhitespace(text[rcursor]):
-            rcursor += 1
-        if rcursor >= tlen:
-            res[left] = None
-            return res
-        elif isQuote(text[rcursor]):
-            # find the end of quote as boundary of value
-            try:
-                endQuoteIndex = text.index(text[rcursor], rcursor+1)
-                valueStr = text[rcursor+1:endQuoteIndex]
-                cursor = endQuoteIndex + 1
-            except ValueError:
-                raise ValueError('unclosed quote ({}) at index {}'.format(text[rcursor], rcursor))
-            res[left] = valueStr if evaluate in ('natural', 'minimal') else evaluation(valueStr, evaluate)
+        if keys is not None:
+            left = keys.setdefault(left, left)
+        cursor = m.end()
+        if unquoted is not None:
+            yield left, unquoted, False
+        elif dquoted is not None or squoted is not None:
+            yield left, squoted if dquoted is None else dquoted, True
+        elif cursor < tlen:
+            raise ValueError('unclosed quote ({}) at index {}'.format(text[cursor], cursor))
+        else:
+            yield left, None, False
+
+
+_TRUE = frozenset('true yes on 1'.split())
+_FALSE = frozenset('false no off 0'.split())
+
+
+def _to_bool(value):
+    """
+    Convert a textual boolean, as ``bool`` would not: ``bool('False')`` is
+    ``True``.
+    """
+    lowered = value.strip().lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    raise ValueError('{!r} is not a boolean'.format(value))
+
+
+# converters standing in for types that do not convert text as expected
+_CONVERTERS = {bool: _to_bool}
+
+
+class AttrsParser(object):
+    """
+    Reusable attribute parser, with an optional schema of the expected keys
+    and their types. Declared values are converted directly by the schema's
+    converter (e.g. ``int``, ``float``, ``str``, or any function of one
+    string), quoted or not, skipping the general evaluation otherwise given
+    to each value. Undeclared keys are evaluated as ``evaluate`` directs, or
+    rejected if ``strict``. Settings are checked and compiled once, so
+    parsing many strings with one parser is much faster than calling
+    ``attrs()`` for each.
+
+    Args:
+        schema (Optional[dict]): Converter to apply to the value of each key
+        evaluate (Union[str, bool]): How to evaluate values of undeclared keys
+        dict (type): Type of mapping to return
+        cstrip (bool): Remove comments from string before interpretation?
+        strict (bool): Raise ``ValueError`` for keys not in the schema?
+        encoding (str): Encoding used to decode binary source
+        cache (Union[EvalCache, bool, None]): Cache for evaluation results
+            of undeclared keys
+        errors (Union[str, EvalErrors]): What to do when the value of an
+            undeclared key fails to evaluate (see ``attrs()``)
+    """
+
+    def __init__(self,
+                 schema=None,
+                 evaluate='natural',
+                 dict=dict,
+                 cstrip=True,
+                 strict=False,
+                 encoding='utf-8',
+                 cache=None,
+                 errors='fallback'):
+        self.schema = _dict(schema or {})
+        self.evaluate = evaluate
+        self.dict = dict
+        self.cstrip = cstrip
+        self.strict = strict
+        self.encoding = encoding
+        self.cache = cache
+        self.errors = errors
+        self._collector = error_collector(errors)
+        self._converters = _dict((key, _CONVERTERS.get(conv, conv))
+                                 for key, conv in self.schema.items())
+        self._quoted_raw = evaluate in ('natural', 'minimal')
+        self._evaluate_value = _evaluator(evaluate, cache, errors)
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(self.__class__.__name__, self.schema)
+
+    def __call__(self, source):
+        return self.parse(source)
+
+    def parse(self, source):
+        """
+        Parse an attribute string, as ``attrs()`` would, but converting
+        values as the schema directs.
+
+        Args:
+            source (Union[str, bytes, List[str]]): Text to parse (as string or list of lines)
+
+        Returns:
+            dict (or given dict type)
+
+        Raises:
+            ValueError: if a declared value does not convert, or a key is
+                undeclared and the parser is ``strict``
+        """
+        text = ensure_text(source, self.encoding)
+        if self.cstrip and '#' in text:
+            text = strip_comments(text)
+        text = text.strip()
+        if _SIMPLE_LINE(text):
+            # an unquoted value is never empty, so if empty, value was quoted
+            pairs = [(k, u or q, not u) for k, q, u in _SIMPLE_PAIRS(text)]
         else:
-            # no quote value, ends with terminating whitespace or ; or ,
-            endValueIndex = indexOfAny(text, [';', ',', ' ', '\t', '\n'], rcursor + 1);
-            if endValueIndex is None:
-                endValueIndex = tlen
-            valueStr = text[rcursor:endValueIndex]
-            res[left] = evaluation(valueStr, evaluate)
-            cursor = endValueIndex + 1
+            pairs = _pairs(text)
 
-        # possible that cursor still rests on terminator
-        while cursor < tlen and text[cursor] in terminalChars:
-            cursor += 1
-    return res
+        converters = self._converters
+        quoted_raw = self._quoted_raw
+        evaluate_value = self._evaluate_value
+        res = self.dict()
+        for key, value, quoted in pairs:
+            convert = converters.get(key)
+            if convert is None:
+                if self.strict:
+                    raise ValueError('unknown key {!r}'.format(key))
+                if value is None or (quoted and quoted_raw):
+                    res[key] = value
+                else:
+                    res[key] = evaluate_value(value)
+            elif value is None:
+                res[key] = None
+            else:
+                try:
+                    res[key] = convert(value)
+                except (ValueError, TypeError) as e:
+                    raise ValueError('bad value {!r} for key {!r} ({})'.format(value, key, e))
+        if self._collector is not None:
+            self._collector.resolve(res)
+        return res
 
 
 class Dict(dict):
@@ -126,10 +503,26 @@ class Dict(dict):
     complete, though only supporting Python 2 at the moment. But if you're on
     Python 3, ``Items`` recommended over ``Dict``.
     """
-    def __init__(self, *args, **kwargs):
-        super(Dict, self).__init__(*args, **kwargs)
-        self.__dict__ = self
-        
+    # Attributes are looked up in the dict itself, rather than by making it
+    # its own __dict__, which would leave every Dict in a reference cycle
+    # that only the cyclic garbage collector could reclaim.
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+    def __delattr__(self, name):
+        try:
+            del self[name]
+        except KeyError:
+            raise AttributeError(name)
+
     def __repr__(self):
         clsname = self.__class__.__name__
         inner = ', '.join('{0}={1!r}'.format(k,v) for k,v in self.items())
@@ -2,28 +2,39 @@
 Conveniently get data from text
 """
 
+from array import array
+from collections import Counter, deque
+import multiprocessing
 import os
 import re
-from itertools import groupby
+from itertools import chain, compress, groupby, islice
 import sys
 import warnings
 
-from .util import noquotes, ensure_text, CSTRIP, _PY2
+from .util import (noquotes, QUOTES, ensure_text, ensure_lines, path_lines,
+                   mmap_lines, strip_comments, strip_comment, find_comment,
+                   blank_comments, filterfalse, _LEADING, _indentation, _dedent_offset,
+                   _PY2, BINARY, _PathLike)
+from .view import LineView
+from .index import IndexedParas, text_index
 
 
 if not _PY2:
     basestring = str
 
 
-__all__ = 'lines text textlines textline words paras'.split()
+__all__ = ('lines iterlines LineView text textlines textline words iterwords '
+           'word_counts word_counts_many paras iterparas map_paras').split()
 
 
-def lines(source, noblanks=True, dedent=True, lstrip=False, rstrip=True,
-          expandtabs=False, cstrip=True, join=False):
+def lines(source=None, noblanks=True, dedent=True, lstrip=False, rstrip=True,
+          expandtabs=False, cstrip=True, join=False, path=None, mmap=False,
+          encoding='utf-8', view=False, match=None, exclude=None, start=None,
+          stop=None, index=None):
     """
     Grab lines from a string. Discard initial and final lines if blank.
 
-    :param str|lines source:  Text (or list of text lines) to be processed
+    :param str|bytes|lines source:  Text (or list of text lines) to be processed
     :param bool dedent:   a common prefix should be stripped from each line (default `True`)
     :param bool noblanks: allow no blank lines at all (default `True`)
     :param bool lstrip:   all left space be stripped from each line (default `False`);
@@ -32,54 +43,125 @@ def lines(source, noblanks=True, dedent=True, lstrip=False, rstrip=True,
     :param Union[bool,int] expandtabs: should all tabs be expanded? if int, by how much?
     :param bool cstrip:   strips comment strings from # to end of each line (like Python itself)
     :param bool|str join:     if False, no effect; otherwise a string used to join the lines
+    :param Optional[str] path: path of a file to read, instead of ``source``
+    :param bool mmap: memory-map the ``path`` file rather than reading it (default `False`)
+    :param str encoding: encoding used to decode binary ``source`` or ``path``
+    :param bool view: return a compact ``LineView`` referring to the source text,
+        rather than a list of new strings (default `False`)
+    :param str|regex|function match: keep only lines this regex is found in
+        (or for which this function is true)
+    :param str|regex|function exclude: discard lines this regex is found in
+        (or for which this function is true)
+    :param Optional[int] start: index of the first source line to process
+    :param Optional[int] stop: index of the source line to stop before
+    :param TextIndex|bool index: index of the ``path`` file, used to seek
+        directly to lines ``start`` to ``stop``; if ``True``, the file's saved
+        index (see ``text_index()``)
     :return: a list of strings
     :rtype: list
+
+    ``match`` and ``exclude`` are applied to each line as found in the source,
+    before comments, blank lines, or indentation are removed, so that no
+    further work is done on discarded lines. Indentation is determined only
+    from the lines kept.
     """
 
-    text = ensure_text(source)
+    match, exclude = _line_test(match), _line_test(exclude)
 
-    if cstrip:
-        text = CSTRIP.sub('', text)
+    if view:
+        if path is not None or expandtabs or start is not None or stop is not None:
+            raise ValueError('view not available with path, expandtabs, start, or stop')
+        textlines = _line_view(ensure_text(source, encoding), noblanks, dedent, lstrip,
+                               rstrip, cstrip, match, exclude)
+        return textlines if join is False else ('' if join is True else join).join(textlines)
 
-    if expandtabs:
-        text = text.expandtabs() if expandtabs is False else text.expandtabs(expandtabs)
+    if path is not None and index:
+        # seek directly to the lines wanted
+        if index is True:
+            index = text_index(path, encoding=encoding)
+        textlines = index.read_lines(start, stop, encoding)
+        start = stop = None
+    elif path is not None:
+        # read the file line by line, never holding its whole text
+        reader = mmap_lines if mmap else path_lines
+        textlines = reader(path, encoding)
+    elif isinstance(source, basestring):
+        textlines = source.splitlines()
+    else:
+        # take lines from sequences, files, and binary data one by one,
+        # never joining them into (or decoding) a single text
+        textlines = ensure_lines(source, encoding)
+    if start is not None or stop is not None:
+        textlines = islice(textlines, start, stop)
+
+    # filter lines first, so no further work is done on those discarded
+    if match:
+        textlines = filter(match, textlines)
+    if exclude:
+        textlines = filterfalse(exclude, textlines)
+    if not isinstance(textlines, list):
+        textlines = list(textlines)
 
-    textlines = text.splitlines()
+    # Cleanups work on the list of lines, creating new strings only where a
+    # line actually changes. Comments and trailing space are cut by finding
+    # where each line's content ends, and indentation by where it begins, so
+    # that each changed line is copied just once. No intermediate copies of
+    # the whole text, and no tab-expanded copies just to measure indentation.
+    if expandtabs:
+        if cstrip:
+            textlines = [strip_comment(line) if '#' in line else line
+                         for line in textlines]
+            cstrip = False
+        textlines = [line.expandtabs(expandtabs) for line in textlines]
+    # only lines with a comment or trailing space need a closer look
+    if cstrip:
+        ends = [_content_end(line, cstrip, rstrip)
+                if '#' in line or line[-1:].isspace() else len(line)
+                for line in textlines]
+    else:
+        ends = [_content_end(line, cstrip, rstrip) if line[-1:].isspace() else len(line)
+                for line in textlines]
+    if rstrip:
+        # blank lines are stripped of everything
+        nonblank = ends
+    else:
+        nonblank = [_SPACE(line, 0, end).end() < end
+                    for line, end in zip(textlines, ends)]
 
     # remove blank lines if noblanks
     if noblanks:
-        textlines = [line for line in textlines if line.strip() != '']
+        if not all(nonblank):
+            textlines = list(compress(textlines, nonblank))
+            ends = list(compress(ends, nonblank))
+        nonblanklines = textlines
     else:
+        nonblanklines = list(compress(textlines, nonblank))
+
         # even if intermediate blank lines ok, first and last are due to Python
         # formatting
-        if textlines and textlines[0].strip() == "":
-            textlines.pop(0)
-        if textlines and textlines[-1].strip() == "":
-            textlines.pop()
+        if textlines and not nonblank[-1]:
+            del textlines[-1], ends[-1]
+        if textlines and not nonblank[0]:
+            del textlines[0], ends[0]
 
         # TODO: decided if these should be while loops, eating all prefix/suffix blank lines
 
-    if dedent and not lstrip:
-        if expandtabs:
-            nonblanklines = [line for line in textlines if line.strip() != ""]
-        else:
-            # if not expanding all tabs, expand tabs at least for purpose of finding common prefix
-            nonblanklines = [line.expandtabs() for line in textlines if line.strip() != ""]
-        prefix = os.path.commonprefix(nonblanklines)
-        prelen, maxprelen = 0, len(prefix)
-        while prelen < maxprelen and prefix[prelen] == ' ':
-            prelen += 1
-        if prelen:
-            textlines = [line[prelen:] for line in textlines]
+    prelen = 0
+    if dedent and not lstrip and nonblanklines:
+        prelen = _common_indentation(nonblanklines)
 
-    # perform requested left and right space stripping (must be done
-    # late so as to not interfere with dedent's common prefix detection)
-    if lstrip and rstrip:
-        textlines = [line.strip() for line in textlines]
-    elif lstrip:
-        textlines = [line.lstrip() for line in textlines]
-    elif rstrip:
-        textlines = [line.rstrip() for line in textlines]
+    # remove common indentation and comments, then perform requested left and
+    # right space stripping (must be done late so as to not interfere with
+    # dedent's common prefix detection), all in a single slice
+    if lstrip:
+        textlines = [line[_SPACE(line, 0, end).end():end]
+                     for line, end in zip(textlines, ends)]
+    elif prelen:
+        # tabs in the indentation count as expanded
+        textlines = [line[prelen if '\t' not in line else _dedent_offset(line, prelen):end]
+                     for line, end in zip(textlines, ends)]
+    else:
+        textlines = [line[:end] for line, end in zip(textlines, ends)]
 
     if join is False:
         return textlines
@@ -88,7 +170,293 @@ def lines(source, noblanks=True, dedent=True, lstrip=False, rstrip=True,
         return join.join(textlines)
 
 
-def text(source, **kwargs):
+def _content_end(line, cstrip=True, rstrip=True):
+    """
+    Return the offset at which the content of ``line`` ends, before any
+    comment (if ``cstrip``) and trailing space (if ``rstrip``), without
+    creating new strings.
+    """
+    end = len(line)
+    if cstrip and '#' in line:
+        i = find_comment(line)
+        if i >= 0:
+            end = i
+    if rstrip:
+        while end and line[end - 1].isspace():
+            end -= 1
+    return end
+
+
+def _line_test(test):
+    """
+    Return a function testing lines against a ``match`` or ``exclude``
+    criterion: a regular expression (either a string or compiled), or a
+    function. ``None`` if there is no criterion.
+    """
+    if test is None or callable(test):
+        return test
+    if isinstance(test, basestring):
+        test = re.compile(test)
+    return test.search
+
+
+def _common_indentation(textlines):
+    """
+    Return the width of the indentation common to all of ``textlines``,
+    which must not be blank. Tabs count as if expanded, but expanded
+    copies are not made.
+    """
+    widths = [_indentation(line) for line in textlines if '\t' in line]
+    plain = [line for line in textlines if '\t' not in line] if widths else textlines
+    if plain:
+        # without tabs, the common indentation is the leading space of the
+        # lines' common prefix, which is in turn the common prefix of the
+        # lexically smallest and largest lines
+        first, last = min(plain), max(plain)
+        widths.append(min(_LEADING(first).end(), _LEADING(last).end(),
+                          len(os.path.commonprefix([first, last]))))
+    return min(widths)
+
+
+def _stream_indentation(textlines):
+    """
+    Like ``_common_indentation()``, but for an iterable of non-blank lines,
+    none of which is kept. Without tabs, only the common leading whitespace
+    seen so far is held.
+    """
+    widths, common = [], None
+    for line in textlines:
+        if '\t' in line:
+            widths.append(_indentation(line))
+            continue
+        lead = line[:_LEADING(line).end()]
+        if common is None:
+            common = lead
+        elif not lead.startswith(common):
+            common = os.path.commonprefix([common, lead])
+    if common is not None:
+        widths.append(len(common))
+    return min(widths) if widths else 0
+
+
+def _source_indentation(source=None, path=None, mmap=False, encoding='utf-8',
+                        cstrip=True, expandtabs=False, match=None, exclude=None):
+    """
+    Measure the indentation ``lines()`` would remove from the whole input,
+    in a first pass over it, so that ``iterlines()`` and the like can then
+    stream the input with an explicit ``indent``. Returns ``None`` if the
+    source cannot be read twice (an iterator or open file).
+    """
+    if path is not None:
+        reader = mmap_lines if mmap else path_lines
+        textlines = reader(path, encoding)
+    elif isinstance(source, (basestring, list, tuple, _PathLike) + BINARY):
+        textlines = ensure_lines(source, encoding)
+    else:
+        return None
+    match, exclude = _line_test(match), _line_test(exclude)
+    if match:
+        textlines = filter(match, textlines)
+    if exclude:
+        textlines = filterfalse(exclude, textlines)
+    return _stream_indentation(_nonblank_lines(textlines, True, cstrip, expandtabs))
+
+
+# line breaks recognized by str.splitlines(), and whitespace runs
+_LINEBREAK = re.compile(u'\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+_SPACE = re.compile(r'\s*').match
+
+
+def _line_spans(text):
+    """
+    Generate the ``(start, end)`` offsets within ``text`` of the lines that
+    ``text.splitlines()`` would return.
+    """
+    start = 0
+    for m in _LINEBREAK.finditer(text):
+        yield start, m.start()
+        start = m.end()
+    if start < len(text):
+        yield start, len(text)
+
+
+def _line_view(text, noblanks=True, dedent=True, lstrip=False, rstrip=True,
+               cstrip=True, match=None, exclude=None):
+    """
+    Perform the same cleanups as ``lines()``, but by narrowing the offsets of
+    each line within ``text`` rather than creating new strings. Returns a
+    ``LineView``.
+    """
+    measure = dedent and not lstrip
+    offsets, prelen = array('Q'), None
+    for start, end in _line_spans(text):
+        if match and not match(text[start:end]):
+            continue
+        if exclude and exclude(text[start:end]):
+            continue
+        if cstrip:
+            i = find_comment(text, start, end)
+            if i >= 0:
+                end = i
+        if _SPACE(text, start, end).end() == end:
+            if noblanks:
+                continue
+        elif measure:
+            lead = _LEADING(text, start, end).end()
+            width = lead - start if text.find('\t', start, lead) < 0 \
+                else _indentation(text[start:lead])
+            if prelen is None or width < prelen:
+                prelen = width
+        offsets.append(start)
+        offsets.append(end)
+
+    if not noblanks:
+        # first and last lines, if blank, are due to Python formatting
+        if offsets and _SPACE(text, offsets[0], offsets[1]).end() == offsets[1]:
+            del offsets[:2]
+        if offsets and _SPACE(text, offsets[-2], offsets[-1]).end() == offsets[-1]:
+            del offsets[-2:]
+
+    for k in range(0, len(offsets), 2):
+        start, end = offsets[k], offsets[k + 1]
+        if prelen:
+            lead = _LEADING(text, start, end).end()
+            start += _dedent_offset(text[start:lead], prelen)
+        if lstrip:
+            start = _SPACE(text, start, end).end()
+        if rstrip and end > start and text[end - 1].isspace():
+            end = start + len(text[start:end].rstrip())
+        offsets[k], offsets[k + 1] = start, end
+    return LineView(text, offsets)
+
+
+def _nonblank_lines(textlines, noblanks=True, cstrip=True, expandtabs=False):
+    """
+    Generate comment-stripped, optionally tab-expanded, lines. Discards all
+    blank lines if ``noblanks``, otherwise just a blank first or last line.
+    """
+    first, pending = True, None
+    for line in textlines:
+        if cstrip:
+            line = strip_comment(line)
+        if expandtabs:
+            line = line.expandtabs(expandtabs)
+        if noblanks:
+            if line and not line.isspace():
+                yield line
+            continue
+        if first:
+            first = False
+            if not line or line.isspace():
+                continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending and not pending.isspace():
+        yield pending
+
+
+def iterlines(source=None, noblanks=True, dedent=True, lstrip=False, rstrip=True,
+              expandtabs=False, cstrip=True, indent=None, lookahead=1000,
+              path=None, mmap=False, encoding='utf-8', match=None, exclude=None):
+    """
+    Like ``lines()``, but generates the cleaned lines one at a time. Reads
+    files and iterators lazily, so memory use stays bounded however large the
+    input. Since the whole input is not seen in advance, the common
+    indentation to remove is either given explicitly (``indent``) or
+    determined from the first ``lookahead`` lines. No line ever loses more
+    than its own leading whitespace.
+
+    :param str|bytes|lines|file source:  Text, list or iterator of lines, open file, or path
+    :param bool noblanks: allow no blank lines at all (default `True`)
+    :param bool dedent:   a common indentation should be stripped from each line (default `True`)
+    :param bool lstrip:   all left space be stripped from each line (default `False`);
+                     dedent and lstrip are mutually exclusive
+    :param bool rstrip:   all right space be stripped from each line (default `True`)
+    :param Union[bool,int] expandtabs: should all tabs be expanded? if int, by how much?
+    :param bool cstrip:   strips comment strings from # to end of each line (like Python itself)
+    :param Optional[int] indent: width of indentation to remove (default: discovered)
+    :param Optional[int] lookahead: how many lines to examine when discovering
+        indentation; if ``None``, the whole input (memory no longer bounded)
+    :param Optional[str] path: path of a file to read, instead of ``source``
+    :param bool mmap: memory-map the ``path`` file rather than reading it (default `False`)
+    :param str encoding: encoding used to decode binary ``source`` or ``path``
+    :param str|regex|function match: keep only lines this regex is found in
+        (or for which this function is true)
+    :param str|regex|function exclude: discard lines this regex is found in
+        (or for which this function is true)
+    :return: an iterator over strings
+    :rtype: iterator
+    """
+    if path is None:
+        textlines = ensure_lines(source, encoding)
+    else:
+        reader = mmap_lines if mmap else path_lines
+        textlines = reader(path, encoding)
+    match, exclude = _line_test(match), _line_test(exclude)
+    if match:
+        textlines = filter(match, textlines)
+    if exclude:
+        textlines = filterfalse(exclude, textlines)
+    textlines = _nonblank_lines(textlines, noblanks, cstrip, expandtabs)
+
+    prelen = 0
+    if dedent and not lstrip:
+        if indent is None:
+            window = list(islice(textlines, lookahead))
+            prelen = _stream_indentation(line for line in window
+                                         if line and not line.isspace())
+            textlines = chain(window, textlines)
+        else:
+            prelen = indent
+
+    for line in textlines:
+        if prelen:
+            line = line[_dedent_offset(line, prelen):]
+        if lstrip and rstrip:
+            line = line.strip()
+        elif lstrip:
+            line = line.lstrip()
+        elif rstrip:
+            line = line.rstrip()
+        yield line
+
+
+def _writer(out):
+    """
+    Given a file-like object or a callback, return a function that writes
+    a list of string chunks to it.
+    """
+    if hasattr(out, 'writelines'):
+        return out.writelines
+    if hasattr(out, 'write'):
+        return lambda chunk: out.write(''.join(chunk))
+    return lambda chunk: out(''.join(chunk))
+
+
+def _write_joined(out, pieces, sep, chunksize=1024):
+    """
+    Write the given string pieces, separated by ``sep``, to ``out`` (a
+    file-like object or a callback) a chunk at a time, so that the joined
+    result never exists as a single string.
+    """
+    emit = _writer(out)
+    chunk = []
+    first = True
+    for piece in pieces:
+        if first:
+            first = False
+        else:
+            chunk.append(sep)
+        chunk.append(piece)
+        if len(chunk) >= chunksize:
+            emit(chunk)
+            chunk = []
+    if chunk:
+        emit(chunk)
+
+
+def text(source=None, out=None, **kwargs):
     """
     Like ``lines()``, but returns result as unified text. Useful primarily
     because of the nice cleanups ``lines()`` does.
@@ -96,11 +464,35 @@ def text(source, **kwargs):
     :param str|lines source:  Text (or list of text lines) to be processed
     :param str join: String to join lines with. Typically newline for line-oriented
         text but change to " " for a single continous line.
-    :return: the cleaned string
+    :param file|function out: if given, a file-like object (or a function
+        taking a string) to which the cleaned text is written incrementally,
+        via ``iterlines()``, rather than returned. The text written is the
+        text that would be returned: the indentation to remove is measured
+        in a first pass over a ``path`` or in-memory source, and iterators
+        and open files are read in full before any is written. ``view``,
+        ``start``, ``stop``, and ``index`` are not available with ``out``.
+    :return: the cleaned string (``None`` if ``out`` is given)
     :rtype: str
     """
-    kwargs.setdefault('join', '\n')
-    return lines(source, **kwargs)
+    join = kwargs.pop('join', '\n')
+    if out is None:
+        return lines(source, join=join, **kwargs)
+
+    unsupported = [name for name in ('view', 'start', 'stop', 'index')
+                   if kwargs.pop(name, None) not in (None, False)]
+    if unsupported:
+        raise ValueError('%s not available with out' % ', '.join(unsupported))
+    join = '\n' if join is False else '' if join is True else join
+    if kwargs.get('dedent', True) and not kwargs.get('lstrip') and 'indent' not in kwargs:
+        prelen = _source_indentation(source, kwargs.get('path'), kwargs.get('mmap', False),
+                                     kwargs.get('encoding', 'utf-8'), kwargs.get('cstrip', True),
+                                     kwargs.get('expandtabs', False), kwargs.get('match'),
+                                     kwargs.get('exclude'))
+        if prelen is None:
+            kwargs['lookahead'] = None
+        else:
+            kwargs['indent'] = prelen
+    _write_joined(out, iterlines(source, **kwargs), join)
 
 
 def textlines(*args, **kwargs):
@@ -111,25 +503,174 @@ def textlines(*args, **kwargs):
     return text(*args, **kwargs)
 
 
-def textline(source, cstrip=True):
+def textline(source, cstrip=True, encoding='utf-8', out=None):
     """
     Like ``text()``, but returns result as unified string that is not
     line-oriented. Really a special case of ``text()``
 
     :param str|list source:
     :param bool cstrip: Should comments be stripped? (default: ``True``)
-    :return: the cleaned string
+    :param str encoding: encoding used to decode binary ``source``
+    :param file|function out: if given, a file-like object (or a function
+        taking a string) to which the result is written incrementally,
+        rather than returned
+    :return: the cleaned string (``None`` if ``out`` is given)
     :rtype: str
     """
-    pars = paras(source, keep_blanks=False, join=" ", cstrip=cstrip)
-    return "\n\n".join(pars)
+    if out is None:
+        pars = paras(source, keep_blanks=False, join=" ", cstrip=cstrip,
+                     encoding=encoding)
+        return "\n\n".join(pars)
+    paras(source, keep_blanks=False, join=" ", cstrip=cstrip,
+          encoding=encoding, out=out)
 
 
 # define word regular expression and pre-define quotes
 WORDRE = re.compile(r"""\s*(?P<word>"[^"]*"|'[^']*'|\S+)\s*""")
+_has_quote = re.compile(r"""["']""").search
+
+# The words WORDRE finds, in groups: the contents of a double- or
+# single-quoted phrase, a word not starting with a quote, or (rarely) one
+# starting with an unmatched quote
+_WORDS = re.compile(r""""([^"]*)"|'([^']*)'|([^\s"']\S*)|(["']\S*)""")
+_QUOTE = re.compile(r"""["']""").search
+_NONSPACE = re.compile(r'\S*').match
+_NONSPACES = re.compile(r'\S+')
 
 
-def words(source, cstrip=True, sep=None):
+def _quoted_words(text):
+    """
+    Find words and quoted phrases in ``text`` in a single pass, stripping
+    quotes as they're found. Equivalent to ``noquotes()`` applied to each
+    ``WORDRE`` match.
+    """
+    if (text.count('"') + text.count("'")) * 20 < len(text):
+        return _scan_words(text)[0]
+    return [noquotes(q) if q else d + s + w
+            for d, s, w, q in _WORDS.findall(text)]
+
+
+def _scan_words(text, partial=False):
+    """
+    Like ``_quoted_words()``, but splits the text between quotes with
+    ``str.split()``, visiting only the quotes individually. Faster when
+    quotes are sparse. Returns the words found, and ``None``. If
+    ``partial``, stops at a quote that opens a phrase not closed within
+    ``text``, returning the words before it and its index instead.
+    """
+    words = []
+    pos = 0
+    while True:
+        m = _QUOTE(text, pos)
+        if m is None:
+            words.extend(text[pos:].split())
+            return words, None
+        i = m.start()
+        before = text[pos:i]
+        words.extend(before.split())
+        if before and not before[-1].isspace():
+            # quote within a word, which runs on to the next space
+            end = _NONSPACE(text, i).end()
+            words[-1] += text[i:end]
+            pos = end
+            continue
+        close = text.find(text[i], i + 1)
+        if close < 0 and partial:
+            return words, i
+        elif close < 0:
+            # unmatched quote starts an ordinary word
+            end = _NONSPACE(text, i).end()
+            words.append(noquotes(text[i:end]))
+            pos = end
+        else:
+            words.append(text[i + 1:close])
+            pos = close + 1
+
+
+def _word_spans(text):
+    """
+    Return the ``(start, end)`` offsets in ``text`` of the words and quoted
+    phrases (less their quotes) ``_quoted_words()`` would find, flattened
+    into an array.
+    """
+    spans = array('Q')
+    if '"' not in text and "'" not in text:
+        spans.extend(chain.from_iterable(m.span() for m in _NONSPACES.finditer(text)))
+        return spans
+    for m in _WORDS.finditer(text):
+        start, end = m.span(m.lastindex)
+        if m.lastindex == 4:
+            # word starting with an unmatched quote; see noquotes()
+            word = text[start:end]
+            if word.endswith(QUOTES):
+                quote = word[0]
+                start += len(word) - len(word.lstrip(quote))
+                end = max(start, end - (len(word) - len(word.rstrip(quote))))
+        spans.append(start)
+        spans.append(end)
+    return spans
+
+
+def _split_spans(text, sep):
+    """
+    Return the ``(start, end)`` offsets in ``text`` of the stripped parts
+    ``text.split(sep)`` would find, flattened into an array.
+    """
+    spans = array('Q')
+    start = 0
+    for part in text.split(sep):
+        end = start + len(part)
+        first = start + len(part) - len(part.lstrip())
+        spans.append(first)
+        spans.append(max(first, start + len(part.rstrip())))
+        start = end + len(sep)
+    return spans
+
+
+def _split_lines(textlines, sep):
+    """
+    Split ``textlines`` on ``sep``, exactly as if they were first joined
+    with newlines, but without joining them. Generates each part, stripped.
+    """
+    partial = None
+    for line in textlines:
+        pieces = line.split(sep)
+        if partial is not None:
+            pieces[0] = partial + '\n' + pieces[0]
+        partial = pieces.pop()
+        for piece in pieces:
+            yield piece.strip()
+    yield '' if partial is None else partial.strip()
+
+
+def _word_lists(textlines):
+    """
+    Generate lists of the words of ``textlines`` (roughly one list per
+    line), exactly as if the lines were first joined with newlines, but
+    without joining them. Only a quoted phrase that spans lines is held
+    until its closing quote is found.
+    """
+    pending = None
+    for line in textlines:
+        if pending is not None:
+            # within a quoted phrase begun on an earlier line
+            pending.append(line)
+            if quote not in line:
+                continue
+            line, pending = '\n'.join(pending), None
+        if '"' not in line and "'" not in line:
+            yield line.split()
+            continue
+        found, start = _scan_words(line, partial=True)
+        yield found
+        if start is not None:
+            quote, pending = line[start], [line[start:]]
+    if pending is not None:
+        # never closed, so not a quoted phrase after all
+        yield _quoted_words('\n'.join(pending))
+
+
+def words(source, cstrip=True, sep=None, encoding='utf-8', spans=False):
     """
     Returns a sequence of words, like qw() in Perl. Similar to s.split(),
     except that it respects quoted spans for the occasional word (really,
@@ -145,25 +686,183 @@ def words(source, cstrip=True, sep=None):
     :param str|list source: Text (or list of text lines) to gather words from
     :param bool cstrip: Should comments be stripped? (default: ``True``)
     :param Optional[str] sep: Optional explicit separator.
+    :param str encoding: encoding used to decode binary ``source``
+    :param bool spans: rather than the words themselves, return their
+        ``(start, end)`` offsets in the ``source`` string, flattened into an
+        ``array`` (default ``False``). Quoted phrases' spans exclude
+        their quotes. A span is contiguous, so one over a comment (in a
+        quoted phrase or ``sep`` part spanning lines) includes the comment
+        that ``words()`` would strip.
     :return: list of words/phrases
     :rtype: list
     """
+    if spans:
+        if not isinstance(source, basestring):
+            raise ValueError('spans require a str source')
+        text = blank_comments(source) if cstrip else source
+        return _word_spans(text) if sep is None else _split_spans(text, sep)
+
+    if isinstance(source, (list, tuple)):
+        # work line by line if possible, without joining into a single text
+        try:
+            quoted = any(map(_has_quote, source))
+        except TypeError:
+            # not all text
+            source = ensure_text(source, encoding)
+        else:
+            textlines = source
+            if cstrip:
+                textlines = [strip_comments(line) if '#' in line else line
+                             for line in textlines]
+            if sep is not None:
+                return list(_split_lines(textlines, sep))
+            if not quoted:
+                return [word for line in textlines for word in line.split()]
+            # quoted phrases may span lines, so must be found in the whole text
+            source, cstrip = '\n'.join(textlines), False
 
-    text = ensure_text(source)
+    text = ensure_text(source, encoding)
 
     if cstrip:
-        text = CSTRIP.sub('', text)
+        text = strip_comments(text)
 
     if sep is None:
-        text = text.strip()
-        parts = re.findall(WORDRE, text)
-        return [noquotes(p) for p in parts]
+        if '"' not in text and "'" not in text:
+            return text.split()
+        return _quoted_words(text)
     else:
         parts = text.split(sep)
         return [p.strip() for p in parts]
 
 
-def paras(source, keep_blanks=False, join=False, cstrip=True):
+def iterwords(source=None, cstrip=True, sep=None, path=None, encoding='utf-8'):
+    """
+    Like ``words()``, but generates words one at a time. Reads files and
+    iterators lazily, line by line, so memory use is bounded by the longest
+    line or quoted phrase (a quote that is never closed is held to the end
+    of the input), not by the size of the input. Quoted phrases and
+    ``sep`` parts spanning lines read that way have their line breaks
+    normalized to ``'\n'``, as ``words()`` gives for a list of lines; in a
+    string, they are kept as they are.
+
+    :param str|bytes|lines|file source: Text, list or iterator of lines, open file, or path
+    :param bool cstrip: Should comments be stripped? (default: ``True``)
+    :param Optional[str] sep: Optional explicit separator.
+    :param Optional[str] path: path of a file to read, instead of ``source``
+    :param str encoding: encoding used to decode binary ``source`` or ``path``
+    :return: an iterator over words/phrases
+    :rtype: iterator
+    """
+    if path is not None:
+        textlines = path_lines(path, encoding)
+    elif isinstance(source, basestring):
+        # split only at newlines, so what spans lines is rejoined exactly
+        # as it was, other line breaks (e.g. CRLF's \r) included
+        textlines = iter(source.split('\n'))
+    else:
+        textlines = ensure_lines(source, encoding)
+    if cstrip:
+        textlines = (strip_comment(line) if '#' in line else line
+                     for line in textlines)
+    if sep is not None:
+        return _split_lines(textlines, sep)
+    return chain.from_iterable(_word_lists(textlines))
+
+
+def word_counts(source=None, cstrip=True, sep=None, path=None, encoding='utf-8'):
+    """
+    Count the words of the source, as ``words()`` would find them, without
+    ever making a list of them all. Reads files and iterators lazily, as
+    ``iterwords()`` does.
+
+    :param str|bytes|lines|file source: Text, list or iterator of lines, open file, or path
+    :param bool cstrip: Should comments be stripped? (default: ``True``)
+    :param Optional[str] sep: Optional explicit separator.
+    :param Optional[str] path: path of a file to read, instead of ``source``
+    :param str encoding: encoding used to decode binary ``source`` or ``path``
+    :return: count of each word
+    :rtype: Counter
+    """
+    return Counter(iterwords(source, cstrip=cstrip, sep=sep, path=path,
+                             encoding=encoding))
+
+
+def word_counts_many(sources, cstrip=True, sep=None, encoding='utf-8',
+                     paths=False, workers=None, chunksize=100):
+    """
+    Count the words of many documents together, as ``word_counts()`` counts
+    one. Documents are counted in batches, optionally in a pool of worker
+    processes, and the batches' counts merged as they finish.
+
+    :param iterable sources: documents (texts, or lists of lines), or file
+        paths if ``paths``
+    :param bool cstrip: Should comments be stripped? (default: ``True``)
+    :param Optional[str] sep: Optional explicit separator.
+    :param str encoding: encoding used to decode binary documents or files
+    :param bool paths: ``sources`` are paths of files to read (default ``False``)
+    :param Optional[int] workers: number of worker processes; if ``None``
+        or 1, the work is done in this process
+    :param int chunksize: number of documents counted in each batch
+    :return: count of each word
+    :rtype: Counter
+    """
+    sources = iter(sources)
+    batches = iter(lambda: list(islice(sources, chunksize)), [])
+    tasks = ((batch, cstrip, sep, encoding, paths) for batch in batches)
+    counts = Counter()
+    for batch_counts in _pool_map(_count_words, tasks, workers):
+        counts.update(batch_counts)
+    return counts
+
+
+def _count_words(task):
+    """
+    Count the words of a batch of documents. Runs in worker processes.
+    """
+    sources, cstrip, sep, encoding, paths = task
+    counts = Counter()
+    for source in sources:
+        if paths:
+            counts.update(iterwords(path=source, cstrip=cstrip, sep=sep,
+                                    encoding=encoding))
+        elif isinstance(source, basestring):
+            # already whole in memory, so quicker tokenized whole
+            counts.update(words(source, cstrip=cstrip, sep=sep))
+        else:
+            counts.update(iterwords(source, cstrip=cstrip, sep=sep,
+                                    encoding=encoding))
+    return counts
+
+
+def _pool_map(func, tasks, workers):
+    """
+    Generate ``func(task)`` for each of ``tasks``, in order. If ``workers``
+    is more than 1, calls are made in a pool of that many processes, with
+    only a few tasks per worker in flight at any one time, so that tasks are
+    taken, and results generated, as the work proceeds.
+    """
+    if not workers or workers == 1:
+        for task in tasks:
+            yield func(task)
+        return
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.apply_async(func, (task,)))
+            if len(pending) > 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def paras(source=None, keep_blanks=False, join=False, cstrip=True, path=None,
+          mmap=False, encoding='utf-8', out=None, workers=None, index=None):
     """
     Given a string or list of text lines, return a list of lists where each
     sub list is a paragraph (list of non-blank lines). If the source is a
@@ -177,20 +876,200 @@ def paras(source, keep_blanks=False, join=False, cstrip=True):
     :param keep_blanks: Should internal blank lines be retained (default: ``False``)
     :param bool|str join: Should paras be joined into a string? (default: ``False``).
     :param bool cstrip: Should comments be stripped? (default: ``True``)
-    :return: list of strings (each a paragraph)
+    :param Optional[str] path: path of a file to read, instead of ``source``
+    :param bool mmap: memory-map the ``path`` file rather than reading it (default `False`)
+    :param str encoding: encoding used to decode binary ``source`` or ``path``
+    :param file|function out: if given, a file-like object (or a function
+        taking a string) to which the joined paragraphs are written
+        incrementally, separated by blank lines, rather than returned;
+        lines are joined with newlines unless ``join`` says otherwise. The
+        paragraphs written are those that would be returned; as for
+        ``text()``, the indentation is measured first
+    :param Optional[int] workers: if given, split paragraphs in a pool of
+        this many processes (see ``map_paras()``)
+    :param TextIndex|bool index: index of the ``path`` file; if given, returns
+        an ``IndexedParas`` sequence that reads each paragraph from the file
+        only when it is accessed. If ``True``, the file's saved index (see
+        ``text_index()``)
+    :return: list of strings (each a paragraph); ``None`` if ``out`` is given
     :rtype: list
     """
+    if path is not None and index:
+        if keep_blanks or out is not None or workers:
+            raise ValueError('index not available with keep_blanks, out, or workers')
+        if index is True:
+            index = text_index(path, cstrip=cstrip, encoding=encoding)
+        return IndexedParas(index, join, encoding)
+
+    if workers:
+        if out is not None and join is False:
+            join = '\n'
+        pars = map_paras(None, source, workers=workers, keep_blanks=keep_blanks,
+                         join=join, cstrip=cstrip, path=path, mmap=mmap,
+                         encoding=encoding)
+        if out is None:
+            return list(pars)
+        _write_joined(out, pars, '\n\n')
+        return
+
+    if out is not None:
+        # stream paragraphs through, never holding more than one (save when
+        # an iterator must be read in full to find its indentation)
+        join = '\n' if join is False else '' if join is True else join
+        prelen = _source_indentation(source, path, mmap, encoding, cstrip)
+        pars = iterparas(source, keep_blanks=keep_blanks, join=join,
+                         cstrip=cstrip, indent=prelen, lookahead=None,
+                         path=path, mmap=mmap, encoding=encoding)
+        _write_joined(out, pars, '\n\n')
+        return
 
     # make sure we have lines, with suitable cleanups
     # note that lines() will guarantee ensure_text()
-    sourcelines = lines(source, noblanks=False, cstrip=cstrip)
+    sourcelines = lines(source, noblanks=False, cstrip=cstrip, path=path,
+                        mmap=mmap, encoding=encoding)
+    return list(_paragraphs(sourcelines, keep_blanks, join))
+
+
+def iterparas(source=None, keep_blanks=False, join=False, cstrip=True,
+              dedent=True, indent=None, lookahead=1000, path=None, mmap=False,
+              encoding='utf-8'):
+    """
+    Like ``paras()``, but generates paragraphs one at a time. Reads files and
+    iterators lazily, holding only the current paragraph (plus, when
+    dedenting the whole input, the first ``lookahead`` lines; see
+    ``iterlines()``) in memory.
+
+    :param str|bytes|lines|file source: Text, list or iterator of lines, open file, or path
+    :param keep_blanks: Should internal blank lines be retained (default: ``False``)
+    :param bool|str join: Should paras be joined into a string? (default: ``False``).
+    :param bool cstrip: Should comments be stripped? (default: ``True``)
+    :param bool|str dedent: strip the indentation common to the input
+        (default: ``True``); if ``'para'``, strip each paragraph's own common
+        indentation instead
+    :param Optional[int] indent: width of indentation to remove (default: discovered)
+    :param Optional[int] lookahead: how many lines to examine when discovering
+        the input's indentation; if ``None``, the whole input
+    :param Optional[str] path: path of a file to read, instead of ``source``
+    :param bool mmap: memory-map the ``path`` file rather than reading it (default `False`)
+    :param str encoding: encoding used to decode binary ``source`` or ``path``
+    :return: an iterator over paragraphs (lists of lines, or strings if joined)
+    :rtype: iterator
+    """
+    per_para = dedent == 'para'
+    sourcelines = iterlines(source, noblanks=False, dedent=dedent and not per_para,
+                            cstrip=cstrip, indent=indent, lookahead=lookahead,
+                            path=path, mmap=mmap, encoding=encoding)
+    for para in _paragraphs(sourcelines, keep_blanks, False):
+        if per_para and para[0]:
+            prelen = _common_indentation(para)
+            if prelen:
+                para = [line[_dedent_offset(line, prelen):] for line in para]
+        yield join.join(para) if join is not False else para
+
 
-    # get paragraphs
-    results = []
-    line_not_blank = lambda l: l.strip() != ""
-    for non_blank, run in groupby(sourcelines, line_not_blank):
+def map_paras(fn, source=None, workers=None, keep_blanks=False, join=False,
+              cstrip=True, chunksize=10000, path=None, mmap=False,
+              encoding='utf-8'):
+    """
+    Split the source into paragraphs, as ``paras()`` does, and generate
+    ``fn(paragraph)`` for each, in order. The input is read lazily and cut
+    into chunks of roughly ``chunksize`` lines at blank lines, so that no
+    paragraph spans two chunks; the chunks are then split and mapped in a
+    pool of ``workers`` processes. Only a few chunks per worker are in
+    flight at any one time, and results are generated as they arrive.
+    The indentation to remove is that common to the whole input, measured in
+    a first pass over a ``path`` or in-memory source; an iterator or open
+    file is read into memory to measure it.
+
+    :param function fn: function to apply to each paragraph; must be
+        picklable (e.g. a module-level function). If ``None``, the
+        paragraphs themselves are generated.
+    :param str|bytes|lines|file source: Text, list or iterator of lines, open file, or path
+    :param Optional[int] workers: number of worker processes; if ``None``
+        or 1, the work is done in this process
+    :param keep_blanks: Should internal blank lines be retained (default: ``False``)
+    :param bool|str join: Should paras be joined into a string? (default: ``False``).
+    :param bool cstrip: Should comments be stripped? (default: ``True``)
+    :param int chunksize: approximate number of lines handed to a worker at once
+    :param Optional[str] path: path of a file to read, instead of ``source``
+    :param bool mmap: memory-map the ``path`` file rather than reading it (default `False`)
+    :param str encoding: encoding used to decode binary ``source`` or ``path``
+    :return: an iterator over results (or paragraphs)
+    :rtype: iterator
+    """
+    prelen = _source_indentation(source, path, mmap, encoding, cstrip)
+    if path is None:
+        textlines = ensure_lines(source, encoding)
+    else:
+        reader = mmap_lines if mmap else path_lines
+        textlines = reader(path, encoding)
+    if prelen is None:
+        textlines = list(textlines)
+        prelen = _stream_indentation(_nonblank_lines(textlines, True, cstrip))
+
+    def tasks():
+        for chunk, last in _para_chunks(textlines, chunksize, cstrip):
+            yield chunk, last, prelen, keep_blanks, join, cstrip, fn
+
+    for results in _pool_map(_chunk_paras, tasks(), workers):
+        for result in results:
+            yield result
+
+
+def _para_chunks(textlines, chunksize, cstrip):
+    """
+    Group raw lines into chunks of at least ``chunksize`` lines, each (other
+    than the last) ending with a blank line and followed by a chunk whose
+    first line is certainly not blank once cleaned. Generates ``(chunk,
+    is_last_chunk)`` pairs.
+    """
+    textlines = iter(textlines)
+    chunk = list(islice(textlines, chunksize))
+    while chunk:
+        # extend the chunk to the next suitable boundary
+        following = []
+        blank = chunk[-1].isspace() or not chunk[-1]
+        for line in textlines:
+            nonblank = line and not line.isspace()
+            if blank and nonblank and not (cstrip and '#' in line):
+                following = [line]
+                following.extend(islice(textlines, chunksize - 1))
+                break
+            chunk.append(line)
+            blank = not nonblank
+        yield chunk, not following
+        chunk = following
+
+
+def _chunk_paras(task):
+    """
+    Split one chunk from ``_para_chunks()`` into paragraphs, and map them.
+    Runs in worker processes.
+    """
+    chunk, last, prelen, keep_blanks, join, cstrip, fn = task
+    if cstrip:
+        chunk = [strip_comment(line) if '#' in line else line for line in chunk]
+    # only the input's own first and last blank lines are dropped; other
+    # chunks begin with a non-blank line
+    if not chunk[0] or chunk[0].isspace():
+        del chunk[0]
+    if last and chunk and (not chunk[-1] or chunk[-1].isspace()):
+        del chunk[-1]
+    if prelen:
+        pad = ' ' * prelen
+        chunk = [line[prelen:] if line.startswith(pad)
+                 else line[_dedent_offset(line, prelen):] for line in chunk]
+    pars = _paragraphs([line.rstrip() for line in chunk], keep_blanks, join)
+    return [fn(para) for para in pars] if fn else list(pars)
+
+
+def _paragraphs(sourcelines, keep_blanks, join):
+    """
+    Group cleaned lines into paragraphs (runs of non-blank lines), yielding
+    each as a list of lines or, if ``join`` is a string, as a joined string.
+    Lines must be right-stripped, so that blank lines are empty.
+    """
+    for non_blank, run in groupby(sourcelines, bool):
         if non_blank or keep_blanks:
             run_list = list(run)
-            payload = join.join(run_list) if join is not False else run_list
-            results.append(payload)
-    return results
+            yield join.join(run_list) if join is not False else run_list
@@ -4,15 +4,76 @@ natural Python values.
 """
 
 from ast import literal_eval as ast_literal_eval
+from collections import OrderedDict, namedtuple
+from copy import deepcopy
+import json
+import re
+import string
 from .util import noquotes
 
 
+# Shapes of string that ``ast.literal_eval`` would evaluate (or reject)
+# predictably, so that the result can be had without parsing and walking an
+# AST. Anything else is left to ``ast.literal_eval``.
+
+# decimal integers (not too long to convert) and floats
+_INT_SHAPE = r'[-+]?(?:[1-9][0-9]{0,17}|0+)'
+_FLOAT_SHAPE = r'[-+]?(?:[0-9]+\.[0-9]*|\.[0-9]+|[0-9]+(?=[eE]))(?:[eE][-+]?[0-9]+)?'
+_INT = re.compile(_INT_SHAPE + r'\Z').match
+_FLOAT = re.compile(_FLOAT_SHAPE + r'\Z').match
+
+_CONSTANTS = {'True': True, 'False': False, 'None': None}
+
+# names other than the constants are never literals
+_NAME = re.compile(r'[A-Za-z_][A-Za-z0-9_]*\Z').match
+
+# ASCII characters that no literal starts with
+_NOT_LITERAL_START = frozenset(string.punctuation) - frozenset('+-.\'"[{(#\\_')
+
+# With a leading digit and no comma (no tuple), a literal can only be a
+# number, or a sum of numbers (e.g. complex), with no other characters
+# than these (or a comment, which is left to ast), and no two dots in one
+# number (as in IP addresses and version numbers)
+_NOT_NUMERIC = re.compile(r'[^0-9a-fA-FxXoObBjJlL_.+\-\s\\()]|\.[0-9]*\.').search
+
+# JSON containers and strings, free of backslash escapes and of bare
+# words such as true and null, decode just as Python literals would
+_JSON_START = frozenset('[{"')
+_JSON_LIKE = re.compile(r'(?:"[^"\\\n]*"|[-+0-9.eE\[\]{},: ])*\Z').match
+_json_decode = json.JSONDecoder().decode
+
+
 def literal_eval(s):
     """
     Wrapper around ``ast.literal_eval`` that returns its return value,
     if possible, but returns the original string in cases where
-    ``ast.literal_eval`` raises an exception.
+    ``ast.literal_eval`` raises an exception. Common, simple values (numbers,
+    ``True``, ``False``, ``None``, plain words, and JSON-like lists and
+    dicts) are recognized and converted directly, with the same results.
     """
+    first = s[:1]
+    if first in '0123456789':
+        if _INT(s):
+            return int(s)
+        if _FLOAT(s):
+            return float(s)
+        if first and _NOT_NUMERIC(s) and ',' not in s and '#' not in s:
+            return s
+    elif first in '+-.':
+        if _INT(s):
+            return int(s)
+        if _FLOAT(s):
+            return float(s)
+    elif s in _CONSTANTS:
+        return _CONSTANTS[s]
+    elif _NAME(s) or first in _NOT_LITERAL_START:
+        return s
+    elif first in _JSON_START and _JSON_LIKE(s):
+        try:
+            return _json_decode(s)
+        except (ValueError, RuntimeError):
+            # RuntimeError: too deeply nested
+            pass
     try:
         return ast_literal_eval(s)
     except (ValueError, SyntaxError):
@@ -26,6 +87,35 @@ natural  = lambda s: literal_eval(s.strip())
 full     = lambda s: literal_eval(noquotes(s.strip()))
 
 
+# typed evaluation functions, for columns known (or inferred) to be of one
+# type; values not of the type are evaluated naturally instead
+
+# (only values that natural evaluation would itself make numbers are
+# converted, as int() and float() also accept e.g. '02134', '1_000', 'nan')
+
+def as_int(s):
+    stripped = s.strip()
+    return int(stripped) if _INT(stripped) else natural(s)
+
+
+def as_float(s):
+    stripped = s.strip()
+    return float(stripped) if _INT(stripped) or _FLOAT(stripped) else natural(s)
+
+
+_BOOLS = {'true': True, 'false': False}
+
+
+def as_bool(s):
+    result = _BOOLS.get(s.strip().lower())
+    return natural(s) if result is None else result
+
+
+def as_str(s):
+    stripped = s.strip()
+    return stripped if _NAME(stripped) and stripped not in _CONSTANTS else natural(s)
+
+
 # mapping of evaluate parameter to evaluation functions
 EVALUATE = {
     'none':    identity,
@@ -38,23 +128,423 @@ EVALUATE = {
     True:      natural,
 
     'full':    full,
+
+    'int':     as_int,
+    'float':   as_float,
+    'bool':    as_bool,
+    'str':     as_str,
 }
 
 
-def evaluation(value, how='natural'):
+# types of results that can be shared, rather than copied, from a cache
+_IMMUTABLE = frozenset([int, float, complex, bool, type(None), type(''), type(b'')])
+
+
+class EvalCache(object):
     """
-    Standard value evaluator. Defaults to the "natural"
-    Python literal encoding.
+    Bounded, least-recently-used cache of evaluation results, keyed by
+    evaluation mode and string. Worthwhile where the same strings recur
+    often, as in the status, host name, or flag columns of operational
+    tables. Results that are mutable (lists, dicts, sets, and anything else
+    not plainly immutable) are copied on the way out, so callers may change
+    what they get without changing what the cache holds. ``hits`` and
+    ``misses`` count lookups, to show whether the cache pays for itself.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+
+    def __len__(self):
+        return len(self._results)
+
+    def __repr__(self):
+        return '{0}(maxsize={1}, size={2}, hits={3}, misses={4})'.format(
+            self.__class__.__name__, self.maxsize, len(self), self.hits, self.misses)
+
+    def clear(self):
+        """
+        Empty the cache and reset its counters.
+        """
+        self._results.clear()
+        self.hits = self.misses = 0
+
+    def wrap(self, key, func):
+        """
+        Return a caching version of the evaluation function ``func``, its
+        results filed under ``key`` (the evaluation mode).
+        """
+        results = self._results
+
+        def evaluate(value):
+            k = (key, value)
+            try:
+                result = results.pop(k)
+            except KeyError:
+                self.misses += 1
+                result = func(value)
+                if len(results) >= self.maxsize:
+                    results.popitem(last=False)
+            else:
+                self.hits += 1
+            # (re)inserted as the most recently used
+            results[k] = result
+            return result if type(result) in _IMMUTABLE else deepcopy(result)
+
+        return evaluate
+
+
+# the cache used when one is requested with ``cache=True``
+CACHE = EvalCache()
+
+
+class EvalError(namedtuple('EvalError', 'row column value exception')):
+    """
+    An evaluation that failed: the position of the value (row and column, as
+    far as they are known), the value, and the exception it raised.
+    """
+    __slots__ = ()
+
+
+class EvalErrors(object):
+    """
+    Collector of evaluation errors, recording the first ``limit`` of them
+    (as ``EvalError`` tuples), and counting them all. Values that fail to
+    evaluate are evaluated minimally instead.
+    """
+
+    def __init__(self, limit=1000):
+        self.limit = limit
+        self.count = 0
+        self.errors = []
+        # failures awaiting their position
+        self._pending = 0
+
+    def __iter__(self):
+        return iter(self.errors)
+
+    def __repr__(self):
+        return '{0}(count={1}, recorded={2})'.format(
+            self.__class__.__name__, self.count, len(self.errors))
+
+    def clear(self):
+        """
+        Forget all errors.
+        """
+        self.count = self._pending = 0
+        del self.errors[:]
+
+    def add(self, row, column, value, exception):
+        """
+        Record an error (if under the limit), and count it.
+        """
+        self.count += 1
+        if len(self.errors) < self.limit:
+            self.errors.append(EvalError(row, column, value, exception))
+
+    def resolve(self, results, row=None, column=None):
+        """
+        Record the failures among ``results``, in place replacing each with
+        its minimal evaluation. ``results`` is either a list (a column, whose
+        indices, counted from ``row``, are the rows) or a dict (a row, whose
+        keys are the columns).
+        """
+        if not self._pending:
+            # clean data costs nothing more
+            return results
+        if isinstance(results, list):
+            failed = [i for i, result in enumerate(results) if type(result) is _Failure]
+            # record as many as there is room for, but count them all
+            room = max(self.limit - len(self.errors), 0)
+            first = row or 0
+            self.errors.extend(EvalError(first + i, column, results[i].value,
+                                         results[i].exception)
+                               for i in failed[:room])
+            self.count += len(failed)
+            self._pending -= len(failed)
+            for i in failed:
+                results[i] = minimal(results[i].value)
+        else:
+            for key, result in list(results.items()):
+                if type(result) is _Failure:
+                    results[key] = self._settle(result, row, key)
+        return results
+
+    def _settle(self, failure, row, column):
+        """
+        Record a failure, returning the value to use instead.
+        """
+        self._pending -= 1
+        self.add(row, column, failure.value, failure.exception)
+        return minimal(failure.value)
+
+
+class _Failure(object):
     """
+    Placeholder for the result of a failed evaluation, until an
+    ``EvalErrors`` records it with its position.
+    """
+    __slots__ = ('value', 'exception')
+
+    def __init__(self, value, exception):
+        self.value = value
+        self.exception = exception
+
+
+# the collector used for ``errors='collect'``
+ERRORS = EvalErrors()
+
+ERROR_POLICIES = ('fallback', 'raise', 'ignore', 'collect')
+
+
+def error_collector(errors):
+    """
+    Return the ``EvalErrors`` collecting errors for the error policy
+    ``errors``, or ``None`` if it collects none.
+    """
+    if errors == 'collect':
+        return ERRORS
+    return errors if isinstance(errors, EvalErrors) else None
+
+
+def evaluator(how='natural', cache=None, errors='fallback'):
+    """
+    Return a function that evaluates values as ``evaluation(value, how)``
+    would, looking up the evaluation mode just once. If ``cache`` is given
+    (an ``EvalCache``, or ``True`` for the shared ``CACHE``), results are
+    cached there.
+
+    ``errors`` says what to do when evaluation fails: evaluate the value
+    minimally instead (``'fallback'``), raise the exception (``'raise'``),
+    make the value ``None`` (``'ignore'``), or collect the error, in the
+    shared ``ERRORS`` (``'collect'``) or in a given ``EvalErrors``.
+    Collected errors have no known position (their row and column are
+    ``None``), and the failed values evaluate minimally.
+    """
+    evaluate = _evaluator(how, cache, errors)
+    collector = error_collector(errors)
+    if collector is None:
+        return evaluate
+
+    def settle(value):
+        result = evaluate(value)
+        if type(result) is _Failure:
+            result = collector._settle(result, None, None)
+        return result
+    return settle
+
+
+def _evaluator(how, cache, errors):
+    """
+    Like ``evaluator``, except that with a collector, failed values
+    evaluate to placeholders that its ``resolve()`` must then replace,
+    recording them with their positions.
+    """
+    if not isinstance(errors, EvalErrors) and errors not in ERROR_POLICIES:
+        raise ValueError('{!r} not a known error policy'.format(errors))
     if hasattr(how, '__call__'):
-        evaluator = how
+        func = how
     else:
         try:
-            evaluator = EVALUATE[how]
+            func = EVALUATE[how]
         except KeyError:
-            raise ValueError('{!r} not a known evaluation mode'.format(how))
-    try:
-        return evaluator(value)
-    except Exception as e:
-        print(e)
-        return minimal(value)
+            def func(value):
+                raise ValueError('{!r} not a known evaluation mode'.format(how))
+            return func
+        if func is identity or func is minimal:
+            # cannot fail, and cheaper than caching
+            return func
+
+    if cache is not None and cache is not False:
+        if cache is True:
+            cache = CACHE
+        # failures are not cached, so each is handled as it happens
+        func = cache.wrap(func, func)
+
+    if errors == 'raise':
+        return func
+
+    collector = error_collector(errors)
+    if collector is not None:
+        def evaluate(value):
+            try:
+                return func(value)
+            except Exception as e:
+                collector._pending += 1
+                # beyond the limit, the exception need not be kept
+                if collector._pending + len(collector.errors) > collector.limit:
+                    e = None
+                return _Failure(value, e)
+    elif errors == 'ignore':
+        def evaluate(value):
+            try:
+                return func(value)
+            except Exception:
+                return None
+    else:
+        def evaluate(value):
+            try:
+                return func(value)
+            except Exception:
+                return minimal(value)
+
+    return evaluate
+
+
+def evaluation(value, how='natural', cache=None, errors='fallback'):
+    """
+    Standard value evaluator. Defaults to the "natural"
+    Python literal encoding. Optionally caches results, and handles errors
+    as ``errors`` directs (see ``evaluator``).
+    """
+    return evaluator(how, cache, errors)(value)
+
+
+# Runs of cells (each ended by a newline) that evaluate all alike: numbers
+# in JSON syntax, which decode as Python literals would, constants, and
+# text that evaluates to itself: plain names, cells starting with
+# punctuation no literal starts with (e.g. paths), and cells starting with
+# a digit that ``literal_eval`` finds not numeric (e.g. timestamps)
+_NUMBER_RUN = re.compile(r'(?:-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?\n)*').match
+_CONSTANT_RUN = re.compile(r'(?:(?:True|False|None)\n)*').match
+_TEXT_RUN = re.compile(r'(?:(?:(?!(?:True|False|None)\n)[A-Za-z_][A-Za-z0-9_]*|'
+                       r'[{0}][^\n]*|'
+                       r'[0-9](?=[^\n]*?(?:[^0-9a-fA-FxXoObBjJlL_.+\-\s\\()]|\.[0-9]*\.))'
+                       r'[^,#\n]*)\n)*'.format(re.escape(''.join(sorted(_NOT_LITERAL_START))))).match
+_NUMBER_START = frozenset('-0123456789')
+_CONSTANT_START = frozenset('TFN')
+
+
+# columns of (stripped) cells, each ended by a newline, all of the shapes
+# that as_int and as_float convert directly
+_INT_COLUMN = re.compile(r'(?:{0}\n)*\Z'.format(_INT_SHAPE)).match
+_FLOAT_COLUMN = re.compile(r'(?:(?:{0}|{1})\n)*\Z'.format(_INT_SHAPE, _FLOAT_SHAPE)).match
+
+
+def _convert_column(convert, shape, cells, values, evaluate):
+    """
+    Convert a column of (stripped) ``cells`` with ``convert``, all in one
+    step if they are all of the given ``shape``, otherwise bisecting down to
+    the values that are not, which ``evaluate`` evaluates instead.
+    """
+    if shape('\n'.join(cells) + '\n'):
+        return list(map(convert, cells))
+    n = len(cells)
+    if n <= 8:
+        return [evaluate(value) for value in values]
+    half = n // 2
+    return (_convert_column(convert, shape, cells[:half], values[:half], evaluate) +
+            _convert_column(convert, shape, cells[half:], values[half:], evaluate))
+
+
+def evaluate_column(values, how='natural', cache=None, errors='fallback', column=None,
+                    row=0):
+    """
+    Evaluate a column of values, giving the same results as calling
+    ``evaluation(value, how)`` on each, but more quickly. The evaluation
+    mode is looked up once for the whole column, and for natural and full
+    evaluation, runs of numbers are decoded together, in one step, and runs
+    of plain words are kept as they are. Only the remaining values are
+    evaluated one by one, with results cached if ``cache`` is given, and
+    errors handled as ``errors`` directs (see ``evaluator``). Collected
+    errors are recorded at ``column``, and at their index in ``values``
+    (counted from ``row``) as their row.
+    """
+    evaluate = _evaluator(how, cache, errors)
+    collector = error_collector(errors)
+    if collector is not None:
+        return collector.resolve(_evaluate_column(values, how, evaluate), row, column)
+    return _evaluate_column(values, how, evaluate)
+
+
+def _evaluate_column(values, how, evaluate):
+    """
+    Evaluate a column of values, as ``evaluate`` (for mode ``how``) would.
+    """
+    if evaluate is identity:
+        return list(values)
+    if evaluate is minimal:
+        return [value.strip() for value in values]
+    base = None if hasattr(how, '__call__') else EVALUATE.get(how)
+    if base is as_int:
+        cells = [value.strip() for value in values]
+        return _convert_column(int, _INT_COLUMN, cells, values, evaluate)
+    if base is as_float:
+        cells = [value.strip() for value in values]
+        return _convert_column(float, _FLOAT_COLUMN, cells, values, evaluate)
+    if base is natural or base is as_str:
+        cells = [value.strip() for value in values]
+    elif base is full:
+        cells = [noquotes(value.strip()) for value in values]
+    else:
+        return [evaluate(value) for value in values]
+
+    text = '\n'.join(cells) + '\n'
+    n = len(cells)
+    if text.count('\n') != n:
+        # values of more than one line; runs cannot be found
+        return [evaluate(value) for value in values]
+    results = []
+    i = pos = 0
+    while i < n:
+        # find the run of cells alike starting here, by its first character
+        first = text[pos]
+        kind, end = 'text', pos
+        if first in _NUMBER_START:
+            kind, end = 'numbers', _NUMBER_RUN(text, pos).end()
+        elif first in _CONSTANT_START and _CONSTANT_RUN(text, pos).end() > pos:
+            kind, end = 'constants', _CONSTANT_RUN(text, pos).end()
+        if end == pos:
+            kind, end = 'text', _TEXT_RUN(text, pos).end()
+        k = text.count('\n', pos, end)
+        if k < 2:
+            # a value of no particular shape, or alone; runs pay off only
+            # when longer
+            results.append(evaluate(values[i]))
+            pos += len(cells[i]) + 1
+            i += 1
+            continue
+        if kind == 'numbers':
+            try:
+                results.extend(_json_decode('[' + text[pos:end - 1].replace('\n', ',') + ']'))
+            except ValueError:
+                # e.g. an integer too long to convert; narrow down to it
+                results.extend(evaluate(value) for value in values[i:i + k])
+        elif kind == 'constants':
+            results.extend([_CONSTANTS[cell] for cell in cells[i:i + k]])
+        else:
+            results.extend(cells[i:i + k])
+        i += k
+        pos = end
+    return results
+
+
+def infer_type(values, sample=1000):
+    """
+    Infer the type of a column of values from (up to) its first ``sample``
+    non-blank values, returning the evaluation mode that best converts it:
+    ``'int'``, ``'float'`` (for floats, perhaps with ints), ``'bool'``,
+    ``'str'`` (for words that evaluate only to themselves), or, for mixed
+    columns, ``'natural'``.
+    """
+    cells = []
+    for value in values:
+        value = value.strip()
+        if value:
+            cells.append(value)
+            if len(cells) >= sample:
+                break
+    if cells and all(cell.lower() in _BOOLS for cell in cells):
+        return 'bool'
+    results = evaluate_column(cells)
+    types = set(type(result) for result in results)
+    if not types or types == set([type('')]):
+        # quoted values evaluate to their contents; only words are str
+        return 'str' if results == cells else 'natural'
+    if types == set([int]):
+        return 'int'
+    if types <= set([int, float]):
+        return 'float'
+    return 'natural'
@@ -0,0 +1,262 @@
+"""
+Persistent index of the line and paragraph offsets of a text file, so that
+given lines or paragraphs can be read directly, without scanning the file
+from its start.
+"""
+
+from array import array
+import codecs
+import io
+import os
+import struct
+import sys
+
+try:
+    from collections.abc import Sequence
+except ImportError:
+    # Python 2
+    from collections import Sequence
+
+from .util import buffer_lines, strip_comment, _LEADING, _indentation
+
+__all__ = 'TextIndex IndexedParas text_index build_index load_index'.split()
+
+
+INDEX_SUFFIX = '.tdx'
+
+# magic, file size, file mtime (ns), indentation, number of line offsets,
+# number of paragraphs, cstrip
+_HEADER = struct.Struct('<8sQqQQQ?')
+_MAGIC = b'TDXINDEX'
+
+
+def _file_stamp(path):
+    """
+    Return the size and modification time (in nanoseconds) of the file at
+    ``path``, which together tell whether an index is still current.
+    """
+    st = os.stat(path)
+    mtime = getattr(st, 'st_mtime_ns', None)
+    if mtime is None:
+        mtime = int(st.st_mtime * 1e9)
+    return st.st_size, mtime
+
+
+class TextIndex(object):
+    """
+    The byte offsets of the lines, and the line numbers at which the
+    paragraphs start and end, of a text file. Lines are those ended by
+    newlines. Paragraphs are runs of non-blank lines, as ``paras()`` finds
+    them (comments are stripped first if ``cstrip``). Also records the
+    indentation common to the file's non-blank lines.
+    """
+
+    __slots__ = ('path', 'size', 'mtime', 'cstrip', 'indent', 'offsets',
+                 'para_starts', 'para_ends')
+
+    def __init__(self, path, size, mtime, cstrip, indent, offsets,
+                 para_starts, para_ends):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.cstrip = cstrip
+        self.indent = indent
+        self.offsets = offsets
+        self.para_starts = para_starts
+        self.para_ends = para_ends
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __repr__(self):
+        return '{0}({1!r}, lines={2}, paras={3})'.format(
+            self.__class__.__name__, self.path, len(self), len(self.para_starts))
+
+    def is_current(self):
+        """
+        Is the index still valid for its file, i.e. have the file's size and
+        modification time not changed since it was built?
+        """
+        try:
+            return _file_stamp(self.path) == (self.size, self.mtime)
+        except OSError:
+            return False
+
+    def read_lines(self, start=None, stop=None, encoding='utf-8'):
+        """
+        Read lines ``start`` up to ``stop`` of the file (with the usual slice
+        semantics), seeking directly to them.
+
+        :param Optional[int] start: index of first line to read
+        :param Optional[int] stop: index of line to stop before
+        :param str encoding: encoding of the file
+        :return: the lines, without line terminators
+        :rtype: list
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return []
+        first, last = self.offsets[start], self.offsets[stop]
+        with io.open(self.path, 'rb') as f:
+            f.seek(first)
+            data = f.read(last - first)
+        return list(buffer_lines(data, encoding))
+
+    def save(self, index_path=None):
+        """
+        Save the index, by default next to its file (with a ``.tdx`` suffix).
+
+        :param Optional[str] index_path: where to save the index
+        """
+        index_path = index_path or self.path + INDEX_SUFFIX
+        temp_path = index_path + '.tmp'
+        with io.open(temp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, self.size, self.mtime, self.indent,
+                                 len(self.offsets), len(self.para_starts),
+                                 self.cstrip))
+            for offsets in (self.offsets, self.para_starts, self.para_ends):
+                if sys.byteorder == 'big':
+                    offsets = array('Q', offsets)
+                    offsets.byteswap()
+                offsets.tofile(f)
+        getattr(os, 'replace', os.rename)(temp_path, index_path)
+
+
+def build_index(path, cstrip=True, encoding='utf-8'):
+    """
+    Scan the file at ``path`` and build its ``TextIndex``.
+
+    :param str path: path of the file to index
+    :param bool cstrip: strip comments before judging lines blank
+    :param str encoding: encoding of the file (must be ASCII-compatible)
+    :return: the index
+    :rtype: TextIndex
+    """
+    size, mtime = _file_stamp(path)
+    offsets = array('Q', [0])
+    para_starts, para_ends = array('Q'), array('Q')
+    indent = None
+    position, in_para = 0, False
+    with io.open(path, 'rb') as f:
+        for lineno, raw in enumerate(f):
+            position += len(raw)
+            offsets.append(position)
+            if cstrip and b'#' in raw:
+                line = strip_comment(codecs.decode(raw, encoding))
+                blank = not line or line.isspace()
+            else:
+                blank = raw.isspace()
+            if blank:
+                if in_para:
+                    para_ends.append(lineno)
+                    in_para = False
+                continue
+            if not in_para:
+                para_starts.append(lineno)
+                in_para = True
+            width = len(raw) - len(raw.lstrip(b' \t'))
+            if indent is None or width < indent:
+                if b'\t' in raw[:width]:
+                    width = _indentation(codecs.decode(raw[:width], 'ascii'))
+                indent = width if indent is None else min(indent, width)
+    if in_para:
+        para_ends.append(len(offsets) - 1)
+    return TextIndex(path, size, mtime, cstrip, indent or 0, offsets,
+                     para_starts, para_ends)
+
+
+def load_index(path, index_path=None):
+    """
+    Load the saved index of the file at ``path``, if there is one and it is
+    still current.
+
+    :param str path: path of the indexed file
+    :param Optional[str] index_path: where the index was saved
+    :return: the index, or ``None``
+    :rtype: Optional[TextIndex]
+    """
+    index_path = index_path or path + INDEX_SUFFIX
+    try:
+        with io.open(index_path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return None
+            magic, size, mtime, indent, n_offsets, n_paras, cstrip = \
+                _HEADER.unpack(header)
+            if magic != _MAGIC:
+                return None
+            arrays = []
+            for n in (n_offsets, n_paras, n_paras):
+                offsets = array('Q')
+                offsets.fromfile(f, n)
+                if sys.byteorder == 'big':
+                    offsets.byteswap()
+                arrays.append(offsets)
+    except (IOError, OSError, EOFError):
+        return None
+    index = TextIndex(path, size, mtime, cstrip, indent, *arrays)
+    return index if index.is_current() else None
+
+
+def text_index(path, cstrip=True, encoding='utf-8', save=True, index_path=None):
+    """
+    Return an index of the file at ``path``: the saved one if it is still
+    current, otherwise a newly built one (which is then saved, if possible,
+    for next time).
+
+    :param str path: path of the file to index
+    :param bool cstrip: strip comments before judging lines blank
+    :param str encoding: encoding of the file (must be ASCII-compatible)
+    :param bool save: save a newly built index
+    :param Optional[str] index_path: where the index is saved
+        (default: next to the file, with a ``.tdx`` suffix)
+    :return: the index
+    :rtype: TextIndex
+    """
+    index = load_index(path, index_path)
+    if index is None or index.cstrip != cstrip:
+        index = build_index(path, cstrip, encoding)
+        if save:
+            try:
+                index.save(index_path)
+            except (IOError, OSError):
+                # the index is only a cache; it still serves this session
+                pass
+    return index
+
+
+class IndexedParas(Sequence):
+    """
+    Read-only sequence of the paragraphs of an indexed file. Each paragraph
+    is read from the file only when accessed, and cleaned as ``paras()``
+    would clean it.
+    """
+
+    __slots__ = ('index', 'join', 'encoding')
+
+    def __init__(self, index, join=False, encoding='utf-8'):
+        self.index = index
+        self.join = join
+        self.encoding = encoding
+
+    def __len__(self):
+        return len(self.index.para_starts)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('paragraph index out of range')
+        index = self.index
+        para = index.read_lines(index.para_starts[i], index.para_ends[i],
+                                self.encoding)
+        if index.cstrip:
+            para = [strip_comment(line) if '#' in line else line for line in para]
+        prelen = index.indent
+        para = [line[min(prelen, _LEADING(line).end()):].rstrip() for line in para]
+        return self.join.join(para) if self.join is not False else para
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(self.__class__.__name__, self.index)
@@ -1,14 +1,14 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import print_function, division, unicode_literals
+import os
 import re
-import textwrap
 import sys
 
 from intspan import intspan
 
-from .eval import evaluation
-from .util import CSTRIP, ensure_text, _PY2, partition
+from .eval import evaluation, evaluate_column, infer_type
+from .util import ensure_lines, strip_comment, _LEADING, _PY2, partition
 from .core import words
 from .attrs import Dict
 
@@ -119,22 +119,42 @@ def find_columns(lines):
     return seps, nonseps, hranges
 
 
-def discover_table(text, header=False, evaluate=True, cstrip=True):
+def table_columns(text, cstrip=True):
     """
-    Return a list of lists representing a table.
+    Find the rows and columns of a table. ``text`` may be a string or a
+    sequence of lines. Returns the content (non-separator) lines, and the
+    half-open ranges of the columns within them.
     """
+    textlines = ensure_lines(text)
     if cstrip:
-        text = CSTRIP.sub('', text)
+        textlines = (strip_comment(line) if '#' in line else line
+                     for line in textlines)
 
     # import text into lines
-    lines = [line.rstrip() for line in text.splitlines() if line.strip()]
+    lines = [line.rstrip() for line in textlines if line and not line.isspace()]
 
-    # remove common indentation (needs round trip back to string, then to lines)
-    cleanlines = '\n'.join(lines)
-    lines = textwrap.dedent(cleanlines).splitlines()
+    # remove common indentation: the leading whitespace of the common prefix
+    # of all lines, itself the common prefix of the smallest and largest lines
+    if lines:
+        prefix = os.path.commonprefix([min(lines), max(lines)])
+        margin = _LEADING(prefix).end()
+        if margin:
+            lines = [line[margin:] for line in lines]
 
     # find the columns
     seps, nonseps, column_indices = find_columns(lines)
+    return nonseps, column_indices
+
+
+def discover_table(text, header=False, evaluate=True, cstrip=True, cache=None,
+                   errors='fallback'):
+    """
+    Return a list of lists representing a table. ``text`` may be
+    a string or a sequence of lines. Evaluation results are cached in
+    ``cache``, if given, and evaluation errors handled as ``errors``
+    directs.
+    """
+    nonseps, column_indices = table_columns(text, cstrip)
     n_columns = len(column_indices)
 
     # extend evaluate for each column, as needed
@@ -151,7 +171,6 @@ def discover_table(text, header=False, evaluate=True, cstrip=True):
 
     # construct table based on discovered understanding
     # of where column breaks are
-    rows = []
     if header is True:
         # use header from table; remove before evaluation
         header = []
@@ -160,45 +179,97 @@ def discover_table(text, header=False, evaluate=True, cstrip=True):
             header.append(evaluation(segment, 'minimal'))
         nonseps = nonseps[1:]
 
-    for l in nonseps:
-        row = []
-        for c, col_evaluate in zip(column_indices, evaluates):
-            segment = l[c[0]:c[1]]
-            row.append(evaluation(segment, col_evaluate))
-        rows.append(row)
+    # evaluate a column at a time, so each is evaluated in bulk; the first
+    # row is likely a header, unless one is given, and is spared the error
+    # policy (e.g. not raising for a header in a column of ints). Rows are
+    # numbered as in the result, where a given header is row 0
+    in_table = not header and len(nonseps) > 1
+    first = 1 if header else 0
+    columns = []
+    for i, (c, col_evaluate) in enumerate(zip(column_indices, evaluates)):
+        column = [l[c[0]:c[1]] for l in nonseps]
+        if col_evaluate == 'infer':
+            # a header still in the table would spoil the inference
+            col_evaluate = infer_type(column[1:] if in_table else column)
+        if in_table:
+            columns.append([evaluation(column[0], col_evaluate, cache)] +
+                           evaluate_column(column[1:], col_evaluate, cache, errors, i, 1))
+        else:
+            columns.append(evaluate_column(column, col_evaluate, cache, errors, i, first))
+    if columns:
+        rows = [list(row) for row in zip(*columns)]
+    else:
+        rows = [[] for l in nonseps]
     if header:
         rows.insert(0, header)
     return rows
 
 
-def table(source, header=None, evaluate=True, cstrip=True):
+def table(source, header=None, evaluate=True, cstrip=True, encoding='utf-8',
+          cache=None, errors='fallback'):
     """
     Return a list of lists representing a table.
 
     Args:
-        source (Union[str, List[str]]): Text to parse (as string or list of lines)
+        source (Union[str, bytes, List[str]]): Text to parse (as string or list of lines)
         header (Union[str, List, None]): Header for the table
         evaluate (Union[str, function, None]): Indicates how to post-process
             table cells. By default, True or "natural" means as Python literals.
             Other options are False or 'minimal' (just string trimming), or
-            None or 'none'.  Can also provide a custom function.
+            None or 'none'.  Can also provide a custom function. 'infer'
+            infers the type of each column (see ``infer_schema``), and
+            converts it accordingly. A list gives modes column by column.
         cstrip (bool): strip comments?
-        
+        encoding (str): Encoding used to decode binary source
+        cache (Union[EvalCache, bool, None]): Cache for evaluation results,
+            worthwhile where values often repeat. True for the shared cache.
+        errors (Union[str, EvalErrors]): What to do when a cell fails to
+            evaluate: 'fallback' to minimal evaluation, 'raise' the
+            exception, 'ignore' it (making the cell None), or 'collect' it
+            (in the shared ``eval.ERRORS``, or a given ``EvalErrors``), noting
+            the row and column of the cell, and falling back. Rows are
+            numbered as in the result. Unless a header is given, the first
+            row is taken for a likely header, and always falls back.
+
     Returns:
         List of lists, where each inner list represents a row.
     """
 
-    text = ensure_text(source)
+    textlines = ensure_lines(source, encoding)
 
     if header:
         if isinstance(header, basestring):
             header = words(header)
 
-    rows = discover_table(text, header=header, evaluate=evaluate, cstrip=True)
+    rows = discover_table(textlines, header=header, evaluate=evaluate, cstrip=True,
+                          cache=cache, errors=errors)
 
     return rows
 
 
+def infer_schema(source, cstrip=True, encoding='utf-8', sample=1000):
+    """
+    Infer the type of each column of a table, as ``table(...,
+    evaluate='infer')`` does: ``'int'``, ``'float'``, ``'bool'``, ``'str'``,
+    or, for mixed columns, ``'natural'``. The first row, usually a header, is
+    not considered. The result can be given as ``table()``'s ``evaluate``, to
+    parse other tables of the same layout without inferring again.
+
+    Args:
+        source (Union[str, bytes, List[str]]): Text to parse (as string or list of lines)
+        cstrip (bool): strip comments?
+        encoding (str): Encoding used to decode binary source
+        sample (int): Number of values of each column to consider
+
+    Returns:
+        List of evaluation modes, one per column.
+    """
+    nonseps, column_indices = table_columns(ensure_lines(source, encoding), cstrip)
+    data = nonseps[1:] or nonseps
+    return [infer_type([l[c[0]:c[1]] for l in data], sample)
+            for c in column_indices]
+
+
 def keyclean(key):
     """
     Default way to clean table headers so they make good
@@ -217,7 +288,7 @@ def records(source, dict=Dict, keyclean=keyclean, **kwargs):
     attribute-accessible Dict (dict subclasses).
 
     Args:
-        source (Union[str, List[str]]): Text to parse (as string or list of lines)
+        source (Union[str, bytes, List[str]]): Text to parse (as string or list of lines)
         dict (type): dictionary subtype in which to return results
         keyclean (Union[Function, None]): function to clean table headers
             into more suitable dictionary keys
@@ -226,9 +297,9 @@ def records(source, dict=Dict, keyclean=keyclean, **kwargs):
     Returns:
         list of dictionaries, one per non-header row
     """
-    text = ensure_text(source)
-
-    rows = table(text, **kwargs)
+    # the header is taken from the table unless given, and never evaluated
+    kwargs.setdefault('header', True)
+    rows = table(source, **kwargs)
     header, rows = rows[0], rows[1:]
     if keyclean:
         header = [keyclean(h) for h in header]
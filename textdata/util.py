@@ -1,4 +1,8 @@
 
+import codecs
+import io
+import mmap
+import os
 import re
 import sys
 
@@ -10,25 +14,307 @@ except ImportError:
 
 _PY2 = sys.version_info[0] == 2
 if not _PY2:
-    basestring = str
+    basestring = unicode = str
 
 
 # regex to find Python comments in the middle of (multiline) strings
 CSTRIP = re.compile(r'#.*$', re.MULTILINE)  # comment stripping regex
 
+# Regex matching the part of a line that precedes any comment. A quote only
+# opens a quoted span at the start of a word or value (so apostrophes as in
+# "don't" do not) and must close on the same line; a # inside a quoted span
+# does not start a comment.
+_BOUNDARY = r'\s=:,;(\[{'
+_QUOTED = r""""(?<![^{0}]")[^"\n]*"|'(?<![^{0}]')[^'\n]*'""".format(_BOUNDARY)
+UNCOMMENTED = re.compile(r"""(?:[^"'#\n]+|{0}|["'])*""".format(_QUOTED))
 
-def ensure_text(source):
+
+def find_comment(text, start=0, end=None):
+    """
+    Return the index at which a comment begins in the line ``text[start:end]``,
+    or -1 if there is none. A ``#`` inside a quoted span does not begin a
+    comment. The quote-aware scan is only needed if a quote precedes the
+    first ``#``.
+    """
+    end = len(text) if end is None else end
+    i = text.find('#', start, end)
+    if i < 0 or (text.find('"', start, i) < 0 and text.find("'", start, i) < 0):
+        return i
+    i = UNCOMMENTED.match(text, start, end).end()
+    return i if i < end else -1
+
+
+def strip_comment(line):
+    """
+    Remove a comment (from ``#`` to the end) from a single ``line``, leaving
+    any ``#`` inside a quoted span alone.
+    """
+    i = find_comment(line)
+    return line if i < 0 else line[:i]
+
+
+def strip_comments(text):
+    """
+    Remove comments (from ``#`` to the end of each line) from ``text``,
+    leaving any ``#`` inside quoted spans alone. Takes no time if there is
+    nothing to strip, and only lines having comments are examined in detail.
+    """
+    if '#' not in text:
+        return text
+    if '"' not in text and "'" not in text:
+        return CSTRIP.sub('', text)
+    pieces = []
+    pos = 0
+    for start, end in _comment_spans(text):
+        pieces.append(text[pos:start])
+        pos = end
+    pieces.append(text[pos:])
+    return ''.join(pieces)
+
+
+def blank_comments(text):
+    """
+    Like ``strip_comments()``, but replaces comments with spaces rather than
+    removing them, so the text keeps its length and its offsets.
+    """
+    if '#' not in text:
+        return text
+    if '"' not in text and "'" not in text:
+        return CSTRIP.sub(lambda m: ' ' * len(m.group()), text)
+    pieces = []
+    pos = 0
+    for start, end in _comment_spans(text):
+        pieces.append(text[pos:start])
+        pieces.append(' ' * (end - start))
+        pos = end
+    pieces.append(text[pos:])
+    return ''.join(pieces)
+
+
+def _comment_spans(text):
+    """
+    Generate the ``(start, end)`` offsets of the comments in ``text``. Only
+    lines where a quote precedes the ``#`` need the quote-aware scan.
+    """
+    for m in CSTRIP.finditer(text):
+        start, end = m.span()
+        line = text.rfind('\n', 0, start) + 1
+        if text.find('"', line, start) >= 0 or text.find("'", line, start) >= 0:
+            start = UNCOMMENTED.match(text, line, end).end()
+            if start == end:
+                # every # on the line is quoted
+                continue
+        yield start, end
+
+
+# binary data types, decoded into text as needed
+BINARY = (bytes, bytearray, memoryview)
+
+
+def ensure_text(source, encoding='utf-8'):
     """
     Given either text or an iterable, return the corresponding text. This
     common pre-process function allows ``textdata`` routines to take varied
-    input, yet confidently process considering only the text case.
+    input, yet confidently process considering only the text case. Binary
+    data (``bytes``, ``bytearray``, ``memoryview``) is decoded with the given
+    ``encoding``.
     """
     if isinstance(source, basestring):
         return source
+    elif isinstance(source, BINARY):
+        return codecs.decode(source, encoding)
     else:
         # a list, tuple, iterator, or generator giving lines of text;
         # convert to a single text for standard cleanups
-        return "\n".join(list(source))
+        textlines = list(source)
+        if textlines and isinstance(textlines[0], BINARY):
+            textlines = [codecs.decode(line, encoding) for line in textlines]
+        return "\n".join(textlines)
+
+
+# line break characters recognized by str.splitlines(); '\r' is omitted
+# from trailing breaks because a trailing '\r' combines with a following '\n'
+# into one break
+_TRAILING_BREAKS = frozenset(u'\n\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029')
+_has_break = re.compile(u'[\r\n\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]').search
+
+_PathLike = getattr(os, 'PathLike', ())
+
+
+def ensure_lines(source, encoding='utf-8'):
+    """
+    Given either text or an iterable, return an iterator over its lines.
+    Gives the same lines as ``ensure_text(source).splitlines()``, but never
+    joins a sequence of lines into a single text. File objects and paths
+    are read lazily, one line at a time. Binary data is decoded one line at
+    a time, with the given ``encoding``.
+    """
+    if isinstance(source, basestring):
+        return iter(source.splitlines())
+    elif isinstance(source, BINARY):
+        return buffer_lines(source, encoding)
+    elif isinstance(source, _PathLike):
+        return path_lines(source, encoding)
+    elif hasattr(source, 'read'):
+        return _file_lines(source, encoding)
+    elif isinstance(source, (list, tuple)) and _simple_lines(source):
+        # already exactly the lines wanted, save that a final empty line
+        # would vanish if joined and split
+        return iter(source[:-1] if source and not source[-1] else source)
+    else:
+        return _sequence_lines(source, encoding)
+
+
+def _simple_lines(textlines):
+    """
+    Are all of the given ``textlines`` text without internal line breaks?
+    """
+    try:
+        if _PY2:
+            # no str.isprintable() to narrow the search; check every line,
+            # and leave byte strings to be decoded
+            return (all(isinstance(line, unicode) for line in textlines) and
+                    not any(map(_has_break, textlines)))
+        # line breaks are unprintable, so only unprintable lines need checking
+        return not any(map(_has_break, filterfalse(str.isprintable, textlines)))
+    except TypeError:
+        # not all text
+        return False
+
+
+def path_lines(path, encoding='utf-8'):
+    """
+    Generate the lines of the file at ``path``, without line terminators.
+    The file is read incrementally and closed when the lines are exhausted.
+    """
+    with io.open(path, encoding=encoding) as f:
+        for line in _file_lines(f):
+            yield line
+
+
+def mmap_lines(path, encoding='utf-8'):
+    """
+    Generate the lines of the file at ``path``, without line terminators.
+    The file is memory-mapped rather than read, and its lines found and
+    decoded as for ``buffer_lines()``.
+    """
+    with io.open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped, and have no lines anyway
+            return
+        try:
+            for line in buffer_lines(mapped, encoding):
+                yield line
+        finally:
+            mapped.close()
+
+
+_NEWLINE = re.compile(b'\n')
+
+
+def buffer_lines(data, encoding='utf-8'):
+    """
+    Generate the lines of binary ``data`` (``bytes``, ``bytearray``,
+    ``memoryview``, ``mmap``, or other buffer), without line terminators.
+    Line boundaries are found by searching the raw bytes, and each line is
+    decoded only as it is generated. ``encoding`` must be ASCII-compatible
+    (e.g. UTF-8 or Latin-1), so that newline bytes always mean newlines.
+    """
+    start = 0
+    for m in _NEWLINE.finditer(data):
+        for line in _decoded_lines(data[start:m.start()], encoding, True):
+            yield line
+        start = m.end()
+    if start < len(data):
+        for line in _decoded_lines(data[start:], encoding):
+            yield line
+
+
+def _decoded_lines(raw, encoding, newline=False):
+    """
+    Decode a raw line, splitting it further if the decoded text contains
+    line breaks other than newlines. If the raw line was followed by a
+    newline, a break at its end also ends an empty line, as in
+    ``_sequence_lines()``.
+    """
+    line = codecs.decode(raw, encoding)
+    if not line:
+        return [line]
+    pieces = line.splitlines()
+    if newline and line[-1] in _TRAILING_BREAKS:
+        pieces.append('')
+    return pieces
+
+
+def _file_lines(f, encoding='utf-8'):
+    """
+    Generate the lines of an open file, without line terminators. Lines read
+    from a binary file are decoded with the given ``encoding``.
+    """
+    for line in f:
+        if isinstance(line, BINARY):
+            line = codecs.decode(line, encoding)
+        for piece in line.splitlines():
+            yield piece
+
+
+def _sequence_lines(source, encoding='utf-8'):
+    """
+    Generate the lines of a sequence of text lines, exactly as if
+    they had been joined with newlines and then split again.
+    """
+    prior = None
+    for item in source:
+        if isinstance(item, BINARY):
+            item = codecs.decode(item, encoding)
+        if prior is not None:
+            if not prior:
+                yield prior
+            else:
+                for piece in prior.splitlines():
+                    yield piece
+                if prior[-1] in _TRAILING_BREAKS:
+                    yield ''
+        prior = item
+    if prior:
+        for piece in prior.splitlines():
+            yield piece
+
+
+# leading space and tab characters of a line
+_LEADING = re.compile(r'[ \t]*').match
+
+
+def _indentation(line, tabsize=8):
+    """
+    Return the width of the leading whitespace of ``line``, expanding
+    any tabs found there, without constructing the expanded line.
+    """
+    n = _LEADING(line).end()
+    if line.find('\t', 0, n) < 0:
+        return n
+    col = 0
+    for c in line[:n]:
+        col = col + 1 if c == ' ' else (col // tabsize + 1) * tabsize
+    return col
+
+
+def _dedent_offset(line, width, tabsize=8):
+    """
+    Return the offset in ``line`` just past ``width`` columns of its leading
+    whitespace (or past all of it, if narrower), counting tabs as expanded.
+    """
+    n = _LEADING(line).end()
+    if line.find('\t', 0, n) < 0:
+        return min(width, n)
+    col = 0
+    for i in range(n):
+        if col >= width:
+            return i
+        col = col + 1 if line[i] == ' ' else (col // tabsize + 1) * tabsize
+    return n
 
 
 QUOTES = ("'", '"')
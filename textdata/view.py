@@ -0,0 +1,76 @@
+"""
+Compact, zero-copy views of lines within a larger text.
+"""
+
+from array import array
+
+try:
+    from collections.abc import Sequence
+except ImportError:
+    # Accommodate prior location of ABCs in Python 2
+    from collections import Sequence
+
+
+class LineView(Sequence):
+    """
+    Read-only sequence of lines, as returned by ``lines(..., view=True)``.
+    Stores the source text just once, plus the start and end offset of each
+    line within it (16 bytes per line). A line's string is only created when
+    that line is accessed. Slicing gives another ``LineView`` over the same
+    text, without copying any of it.
+    """
+
+    __slots__ = ('text', 'offsets')
+
+    def __init__(self, text, offsets=None):
+        self.text = text
+        self.offsets = array('Q') if offsets is None else offsets
+
+    def __len__(self):
+        return len(self.offsets) // 2
+
+    def __getitem__(self, index):
+        offsets = self.offsets
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return LineView(self.text, offsets[2 * start:2 * stop])
+            subset = array('Q')
+            for i in range(start, stop, step):
+                subset.append(offsets[2 * i])
+                subset.append(offsets[2 * i + 1])
+            return LineView(self.text, subset)
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError('LineView index out of range')
+        return self.text[offsets[2 * index]:offsets[2 * index + 1]]
+
+    def __iter__(self):
+        text = self.text
+        ends = iter(self.offsets)
+        for start in ends:
+            yield text[start:next(ends)]
+
+    def spans(self):
+        """
+        Return an iterator over the ``(start, end)`` offsets of each line
+        within ``text``.
+        """
+        ends = iter(self.offsets)
+        return zip(ends, ends)
+
+    def __eq__(self, other):
+        if isinstance(other, (LineView, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(self.__class__.__name__, list(self))